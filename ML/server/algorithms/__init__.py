@@ -1,26 +1,24 @@
 """
 Route analysis and optimization algorithms for CityCircuit ML Service
+
+Submodules are imported lazily on first attribute access (PEP 562) so that
+importing the package does not pull in TensorFlow/NumPy for callers that
+only need one component, e.g. the DataExporter.
 """
 
-from .route_analyzer import RouteAnalyzer, RouteAnalysisResult
-from .population_analyzer import PopulationAnalyzer, PopulationAnalysisResult
-from .path_matrix import PathMatrixCalculator, PathMatrix, PathAlgorithm
-from .optimization_engine import OptimizationEngine
-from .result_generator import (
-    OptimizationResultGenerator, EfficiencyMetricsCalculator, 
-    RouteRankingEngine, RankingCriteria
-)
-from .data_exporter import DataExporter, DataValidator, DataImporter, ExportFormat
+import importlib
 
-__all__ = [
+__all__ = (
     'RouteAnalyzer',
-    'RouteAnalysisResult', 
+    'RouteAnalysisResult',
     'PopulationAnalyzer',
     'PopulationAnalysisResult',
     'PathMatrixCalculator',
     'PathMatrix',
     'PathAlgorithm',
+    'ShortestPathMethod',
     'OptimizationEngine',
+    'get_optimization_engine',
     'OptimizationResultGenerator',
     'EfficiencyMetricsCalculator',
     'RouteRankingEngine',
@@ -28,5 +26,57 @@ __all__ = [
     'DataExporter',
     'DataValidator',
     'DataImporter',
-    'ExportFormat'
-]
\ No newline at end of file
+    'ExportFormat',
+)
+
+_ALL_SET = frozenset(__all__)
+
+# Public symbol -> submodule that defines it
+_LAZY = {
+    'RouteAnalyzer': 'route_analyzer',
+    'RouteAnalysisResult': 'route_analyzer',
+    'PopulationAnalyzer': 'population_analyzer',
+    'PopulationAnalysisResult': 'population_analyzer',
+    'PathMatrixCalculator': 'path_matrix',
+    'PathMatrix': 'path_matrix',
+    'PathAlgorithm': 'path_matrix',
+    'ShortestPathMethod': 'path_matrix',
+    'OptimizationEngine': 'optimization_engine',
+    'get_optimization_engine': 'optimization_engine',
+    'OptimizationResultGenerator': 'result_generator',
+    'EfficiencyMetricsCalculator': 'result_generator',
+    'RouteRankingEngine': 'result_generator',
+    'RankingCriteria': 'result_generator',
+    'DataExporter': 'data_exporter',
+    'DataValidator': 'data_exporter',
+    'DataImporter': 'data_exporter',
+    'ExportFormat': 'data_exporter',
+}
+
+# Submodule -> ImportError raised while loading it (e.g. a dependency stripped
+# from a deployment image); other components stay importable
+_IMPORT_ERRORS = {}
+
+
+def __getattr__(name):
+    """Resolve public symbols on first access and cache them on the package"""
+    if name not in _ALL_SET:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name = _LAZY[name]
+    if module_name in _IMPORT_ERRORS:
+        raise AttributeError(f"{name} unavailable: {_IMPORT_ERRORS[module_name]}")
+
+    try:
+        module = importlib.import_module('.' + module_name, __name__)
+    except ImportError as e:
+        _IMPORT_ERRORS[module_name] = e
+        raise AttributeError(f"{name} unavailable: {e}") from e
+
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
@@ -6,13 +6,47 @@ Implements route data export in standard transportation formats with validation
 import json
 import csv
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Set, Tuple, Union, Iterable, Iterator
 from datetime import datetime, timezone
 from enum import Enum
-from io import StringIO
+from io import StringIO, BytesIO, TextIOWrapper
+from contextlib import contextmanager
+from xml.sax.saxutils import XMLGenerator
+from itertools import chain
 import zipfile
 import tempfile
 import os
+import base64
+import threading
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used instead
+    orjson = None
+
+try:
+    import lxml.etree as LET
+except ImportError:  # lxml is optional; XML is streamed with xml.sax.saxutils instead
+    LET = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; encoded GeoJSON is decoded in full instead
+    ijson = None
+
+try:
+    import pandas as pd
+except ImportError:  # pandas is optional; CSV imports are parsed with csv.DictReader instead
+    pd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; Parquet export is unavailable without it
+    pa = None
+    pq = None
 
 from models import Route, BusStop, OptimizationResult, PopulationDensityData, Coordinates
 
@@ -24,6 +58,252 @@ class ExportFormat(Enum):
     CSV = "csv"    # Comma-separated values
     XML = "xml"    # XML format
     GEOJSON = "geojson"  # GeoJSON for geographic data
+    JSONL = "jsonl"  # JSON Lines, one route per line
+    PARQUET = "parquet"  # Apache Parquet, columnar (requires pyarrow)
+
+
+# Code points outside the XML 1.0 Char production, mapped to '?'. Valid characters are
+# #x9 | #xA | #xD | [#x20-#xD7FF] | [#xE000-#xFFFD] | [#x10000-#x10FFFF]
+_XML_INVALID_TABLE = dict.fromkeys(
+    [c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D)]
+    + list(range(0xD800, 0xE000))
+    + [0xFFFE, 0xFFFF],
+    ord('?')
+)
+_XML_ASCII_CONTROL_CHARS = frozenset(chr(c) for c in range(0x20) if c not in (0x09, 0x0A, 0x0D))
+
+
+def _dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+        )
+    return json.dumps(obj, default=_json_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _json_default(obj: Any) -> Any:
+    """Fallback encoder for the stdlib json path: arrays as lists, anything else as str"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+def _loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON text, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+if pa is not None:
+    PARQUET_ROUTE_SCHEMA = pa.schema([
+        ("route_id", pa.string()),
+        ("name", pa.string()),
+        ("description", pa.string()),
+        ("operator_id", pa.string()),
+        ("estimated_travel_time", pa.int32()),
+        ("optimization_score", pa.float64())
+    ])
+    PARQUET_STOP_SCHEMA = pa.schema([
+        ("stop_id", pa.string()),
+        ("route_id", pa.string()),
+        ("stop_name", pa.string()),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("address", pa.string()),
+        ("amenities", pa.list_(pa.string())),
+        ("daily_passenger_count", pa.int32()),
+        ("is_accessible", pa.bool_()),
+        ("stop_sequence", pa.int32())
+    ])
+else:
+    PARQUET_ROUTE_SCHEMA = None
+    PARQUET_STOP_SCHEMA = None
+
+
+def _read_parquet_file(encoded: str):
+    """Decode a base64-encoded Parquet file produced by DataExporter into a pyarrow Table"""
+    if pq is None:
+        raise ImportError("Parquet import requires pyarrow to be installed")
+    return pq.read_table(pa.BufferReader(base64.b64decode(encoded)))
+
+
+# Every CSV export uses this dialect: minimal quoting and CRLF line endings (RFC 4180;
+# GTFS accepts LF or CRLF). All arguments are spelled out so csv.writer skips the dialect
+# lookup. The terminator stays CRLF because before Python 3.12 QUOTE_MINIMAL only quotes
+# line-break characters that occur in lineterminator, so an LF terminator would leave a
+# bare '\r' inside a field unquoted and break the round trip.
+_CSV_LINE_TERMINATOR = "\r\n"
+_CSV_WRITER_OPTIONS = {
+    "delimiter": ",",
+    "quotechar": '"',
+    "doublequote": True,
+    "skipinitialspace": False,
+    "lineterminator": _CSV_LINE_TERMINATOR,
+    "quoting": csv.QUOTE_MINIMAL,
+    "strict": False
+}
+_CSV_SPECIAL_CHARS = frozenset(',"\r\n')
+
+# Column types of the CSV route export, as read back by DataImporter
+_ROUTES_CSV_DTYPES = {
+    "route_id": str,
+    "name": str,
+    "description": str,
+    "operator_id": str,
+    "estimated_travel_time": int,
+    "optimization_score": float
+}
+_STOPS_CSV_DTYPES = {
+    "route_id": str,
+    "stop_name": str,
+    "latitude": float,
+    "longitude": float,
+    "address": str,
+    "amenities": str,
+    "daily_passenger_count": int,
+    "is_accessible": str
+}
+
+
+def _csv_writer(output) -> Any:
+    """csv.writer over a text stream, using the export CSV dialect"""
+    return csv.writer(output, **_CSV_WRITER_OPTIONS)
+
+
+def _read_csv_columns(text: str, dtypes: Dict[str, type]) -> Dict[str, list]:
+    """Parse CSV text into one list of typed Python values per requested column"""
+    if pd is not None:
+        # Types are parsed in C; round_trip keeps floats bit-identical to what was exported
+        frame = pd.read_csv(StringIO(text), usecols=list(dtypes), dtype=dtypes,
+                            na_filter=False, float_precision='round_trip')
+        return {name: frame[name].tolist() for name in dtypes}
+    
+    columns = {name: [] for name in dtypes}
+    for row in csv.DictReader(StringIO(text)):
+        for name, dtype in dtypes.items():
+            columns[name].append(dtype(row[name]))
+    return columns
+
+
+def _csv_field(value: str) -> str:
+    """Quote a CSV field exactly as csv.writer's QUOTE_MINIMAL dialect would"""
+    if _CSV_SPECIAL_CHARS.isdisjoint(value):
+        return value
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _join_csv_rows(rows: Iterable[List[str]]) -> str:
+    """Format rows of plain string fields as CSV text without a csv.writer"""
+    return "".join(",".join(map(_csv_field, row)) + _CSV_LINE_TERMINATOR for row in rows)
+
+
+# Simplified timing: trips depart at 08:00 with 5 minutes between stops. Times are
+# looked up rather than formatted per stop; GTFS allows them to run past 24:00.
+_GTFS_TRIP_TIMES = [f"{minutes // 60:02d}:{minutes % 60:02d}:00" for minutes in range(8 * 60, 48 * 60, 5)]
+
+
+def _gtfs_trip_times(stop_count: int) -> List[str]:
+    """Arrival times for each stop of a trip"""
+    times = _GTFS_TRIP_TIMES[:stop_count]
+    if len(times) < stop_count:
+        times.extend([_GTFS_TRIP_TIMES[-1]] * (stop_count - len(times)))
+    return times
+
+
+class _XMLStreamWriter:
+    """Stdlib stand-in for lxml.etree.xmlfile, writing SAX events to a text stream"""
+    
+    def __init__(self, output):
+        self._generator = XMLGenerator(output, encoding='utf-8', short_empty_elements=True)
+    
+    @contextmanager
+    def element(self, tag: str, attrib: Optional[Dict[str, str]] = None):
+        self._generator.startElement(tag, attrib or {})
+        yield
+        self._generator.endElement(tag)
+    
+    def write(self, text: str):
+        self._generator.characters(text)
+
+
+class _XMLStopTemplate:
+    """Reusable lxml <stop> element, refilled for every stop instead of rebuilt"""
+    
+    def __init__(self):
+        self.element = LET.Element("stop", {"id": "", "sequence": ""})
+        self.fields = [
+            LET.SubElement(self.element, tag)
+            for tag in ("name", "latitude", "longitude", "address", "daily_passenger_count", "is_accessible")
+        ]
+        self.amenities = LET.SubElement(self.element, "amenities")
+    
+    def fill(self, stop: BusStop, sequence: int, sanitize, amenities: List[str]) -> Any:
+        """Load a stop into the template and return the element, ready to be written"""
+        self.element.set("id", sanitize(stop.id))
+        self.element.set("sequence", str(sequence))
+        
+        name, latitude, longitude, address, passengers, accessible = self.fields
+        name.text = sanitize(stop.name)
+        latitude.text = str(stop.coordinates.latitude)
+        longitude.text = str(stop.coordinates.longitude)
+        address.text = sanitize(stop.address)
+        passengers.text = str(stop.daily_passenger_count)
+        accessible.text = str(stop.is_accessible)
+        
+        amenities_element = self.amenities
+        del amenities_element[:]
+        for amenity in amenities:
+            LET.SubElement(amenities_element, "amenity").text = amenity
+        return self.element
+
+
+# Specification compliance per export format. Shared by every export, so treat as read-only.
+_FORMAT_COMPLIANCE: Dict[ExportFormat, Dict[str, Any]] = {
+    ExportFormat.GTFS: {
+        "specification": "GTFS Static",
+        "version": "1.0",
+        "compliance_level": "basic",
+        "required_files": ["agency.txt", "routes.txt", "stops.txt", "trips.txt", "stop_times.txt", "calendar.txt"]
+    },
+    ExportFormat.JSON: {
+        "specification": "CityCircuit JSON Schema",
+        "version": "1.0",
+        "compliance_level": "full"
+    },
+    ExportFormat.CSV: {
+        "specification": "CityCircuit CSV Format",
+        "version": "1.0",
+        "compliance_level": "full",
+        "files": ["routes.csv", "stops.csv"]
+    },
+    ExportFormat.XML: {
+        "specification": "CityCircuit XML Schema",
+        "version": "1.0",
+        "compliance_level": "full"
+    },
+    ExportFormat.GEOJSON: {
+        "specification": "GeoJSON RFC 7946",
+        "version": "1.0",
+        "compliance_level": "full"
+    },
+    ExportFormat.JSONL: {
+        "specification": "JSON Lines",
+        "version": "1.0",
+        "compliance_level": "full"
+    },
+    ExportFormat.PARQUET: {
+        "specification": "Apache Parquet",
+        "version": "2.6",
+        "compliance_level": "full",
+        "files": ["routes.parquet", "stops.parquet"]
+    }
+}
+
+
+_STOPS_CSV_HEADER = ["stop_id", "route_id", "stop_name", "latitude", "longitude", "address", "amenities",
+                     "daily_passenger_count", "is_accessible", "stop_sequence"]
 
 
 class DataExporter:
@@ -33,6 +313,27 @@ class DataExporter:
     
     def __init__(self):
         self.supported_formats = list(ExportFormat)
+        self.export_handlers = {
+            ExportFormat.GTFS: self._export_gtfs,
+            ExportFormat.JSON: self._export_json,
+            ExportFormat.CSV: self._export_csv,
+            ExportFormat.XML: self._export_xml,
+            ExportFormat.GEOJSON: self._export_geojson,
+            ExportFormat.JSONL: self._export_jsonl,
+            ExportFormat.PARQUET: self._export_parquet
+        }
+        self.optimization_export_handlers = {
+            ExportFormat.JSON: self._export_optimization_results_json,
+            ExportFormat.CSV: self._export_optimization_results_csv
+        }
+        # Per-thread CSV buffer and writer, reused across files and exports
+        self._csv_local = threading.local()
+        # Formats export_route_data_iter can stream, with their response media types
+        self.streaming_formats = {
+            ExportFormat.JSON: "application/json",
+            ExportFormat.JSONL: "application/x-ndjson",
+            ExportFormat.CSV: "text/csv"
+        }
     
     def export_route_data(self, routes: List[Route], format_type: ExportFormat, 
                          include_metadata: bool = True) -> Dict[str, Any]:
@@ -47,18 +348,146 @@ class DataExporter:
         Returns:
             Dictionary containing exported data and metadata
         """
-        if format_type == ExportFormat.GTFS:
-            return self._export_gtfs(routes, include_metadata)
-        elif format_type == ExportFormat.JSON:
-            return self._export_json(routes, include_metadata)
+        handler = self.export_handlers.get(format_type)
+        if handler is None:
+            raise ValueError(f"Unsupported export format: {format_type}")
+        
+        return handler(routes, include_metadata)
+    
+    def export_route_data_iter(self, routes: Iterable[Route], format_type: ExportFormat,
+                               chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Stream route data as encoded chunks, e.g. as a Flask streaming response body
+        
+        Routes are consumed and encoded one at a time, so neither the route list nor the
+        exported document has to be held in memory. Metadata is not included. JSON yields
+        the same document as export_route_data(routes, ExportFormat.JSON, False); JSONL
+        yields one line per route; CSV yields stops.csv, whose rows carry their route ID.
+        
+        Args:
+            routes: Iterable of Route objects to export
+            format_type: One of the formats in streaming_formats
+            chunk_size: Approximate size of each CSV chunk in characters
+            
+        Returns:
+            Iterator over UTF-8 encoded chunks of the export
+        """
+        if format_type == ExportFormat.JSON:
+            return self._iter_json(routes)
+        elif format_type == ExportFormat.JSONL:
+            return (line + b'\n' for line in self._iter_jsonl_lines(routes))
         elif format_type == ExportFormat.CSV:
-            return self._export_csv(routes, include_metadata)
-        elif format_type == ExportFormat.XML:
-            return self._export_xml(routes, include_metadata)
-        elif format_type == ExportFormat.GEOJSON:
-            return self._export_geojson(routes, include_metadata)
+            rows = chain([_STOPS_CSV_HEADER], self._csv_stop_rows(routes))
+            return (chunk.encode('utf-8') for chunk in self.yield_csv_chunks(rows, chunk_size))
         else:
-            raise ValueError(f"Unsupported export format: {format_type}")
+            raise ValueError(f"Streaming export not supported for format: {format_type}")
+    
+    def _iter_json(self, routes: Iterable[Route]) -> Iterator[bytes]:
+        """Yield the JSON route export piece by piece, counting totals on the way"""
+        yield b'{"format":' + _dumps(ExportFormat.JSON.value) + b',"data":{"routes":['
+        
+        total_routes = 0
+        total_stops = 0
+        for route in routes:
+            encoded = route.__pydantic_serializer__.to_json(route)
+            yield encoded if total_routes == 0 else b',' + encoded
+            total_routes += 1
+            total_stops += len(route.stops)
+        
+        export_info = {"total_routes": total_routes, "total_stops": total_stops}
+        yield b'],"export_info":' + _dumps(export_info) + b'}}'
+    
+    def export_route_data_json_bytes(self, routes: List[Route],
+                                     include_metadata: bool = True) -> bytes:
+        """
+        Export routes as an encoded JSON document
+        
+        Produces the same document as export_route_data(routes, ExportFormat.JSON),
+        encoded once as UTF-8 bytes. Callers should send or write the bytes as-is
+        rather than decoding and re-encoding them with json.dumps.
+        
+        Args:
+            routes: List of Route objects to export
+            include_metadata: Whether to include export metadata
+            
+        Returns:
+            UTF-8 encoded JSON document
+        """
+        parts = [
+            b'{"format":', _dumps(ExportFormat.JSON.value),
+            b',"data":{"routes":', self._models_to_json_bytes(routes),
+            b',"export_info":', _dumps(self._json_export_info(routes)), b'}'
+        ]
+        
+        if include_metadata:
+            parts += [b',"metadata":', _dumps(self._generate_export_metadata(routes, ExportFormat.JSON))]
+        
+        parts.append(b'}')
+        return b''.join(parts)
+    
+    def export_route_data_geojson_bytes(self, routes: List[Route],
+                                        include_metadata: bool = True) -> bytes:
+        """
+        Export routes as an encoded GeoJSON document
+        
+        Decodes to the same document as export_route_data(routes, ExportFormat.GEOJSON).
+        Coordinates are gathered into float64 arrays and written straight from the
+        array buffers, which is much faster than the dict export for large stop sets.
+        
+        Args:
+            routes: List of Route objects to export
+            include_metadata: Whether to include export metadata
+            
+        Returns:
+            UTF-8 encoded GeoJSON export document
+        """
+        return self._export_geojson_numpy(routes, include_metadata)
+    
+    def export_optimization_results_json_bytes(self, results: List[OptimizationResult]) -> bytes:
+        """
+        Export optimization results as an encoded JSON document
+        
+        Same document as export_optimization_results(results, ExportFormat.JSON),
+        encoded once as UTF-8 bytes.
+        
+        Args:
+            results: List of OptimizationResult objects to export
+            
+        Returns:
+            UTF-8 encoded JSON document
+        """
+        export_info, metadata = self._optimization_results_envelope(results)
+        
+        return b''.join([
+            b'{"format":', _dumps(ExportFormat.JSON.value),
+            b',"data":{"optimization_results":', self._models_to_json_bytes(results),
+            b',"export_info":', _dumps(export_info), b'}',
+            b',"metadata":', _dumps(metadata), b'}'
+        ])
+    
+    def _models_to_json_bytes(self, models: List[Any]) -> bytes:
+        """Encode models as a JSON array with pydantic-core's serializer, skipping dict copies"""
+        return b'[' + b','.join(model.__pydantic_serializer__.to_json(model) for model in models) + b']'
+    
+    def write_route_data_jsonl(self, routes: List[Route], fp) -> int:
+        """
+        Stream routes to a binary file object as JSON Lines
+        
+        Only one route is encoded at a time, so the whole document is never held in memory.
+        
+        Args:
+            routes: Iterable of Route objects to export
+            fp: Binary file object to write to
+            
+        Returns:
+            Number of routes written
+        """
+        count = 0
+        for line in self._iter_jsonl_lines(routes):
+            fp.write(line)
+            fp.write(b"\n")
+            count += 1
+        return count
     
     def export_optimization_results(self, results: List[OptimizationResult], 
                                   format_type: ExportFormat) -> Dict[str, Any]:
@@ -72,91 +501,39 @@ class DataExporter:
         Returns:
             Dictionary containing exported data and metadata
         """
-        if format_type == ExportFormat.JSON:
-            return self._export_optimization_results_json(results)
-        elif format_type == ExportFormat.CSV:
-            return self._export_optimization_results_csv(results)
-        else:
+        handler = self.optimization_export_handlers.get(format_type)
+        if handler is None:
             raise ValueError(f"Optimization results export not supported for format: {format_type}")
+        
+        return handler(results)
     
     def _export_gtfs(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
         """Export routes in GTFS format"""
         # GTFS requires multiple files: agency.txt, routes.txt, stops.txt, stop_times.txt, trips.txt
         
-        # Collect all unique stops
-        all_stops = {}
-        for route in routes:
-            for stop in route.stops:
-                all_stops[stop.id] = stop
+        # Trips, unique stops and per-trip stop times come from a single pass over the routes
+        trips_txt, stops_txt, stop_times_txt = self._gtfs_trips_stops_and_stop_times(routes)
         
         # Generate GTFS files
         gtfs_files = {}
         
         # agency.txt
-        agency_data = [
-            ["agency_id", "agency_name", "agency_url", "agency_timezone"],
-            ["citycircuit", "CityCircuit Transport", "https://citycircuit.com", "Asia/Kolkata"]
-        ]
-        gtfs_files["agency.txt"] = self._list_to_csv(agency_data)
+        gtfs_files["agency.txt"] = _join_csv_rows(self._gtfs_agency_rows())
         
         # routes.txt
-        routes_data = [["route_id", "agency_id", "route_short_name", "route_long_name", "route_type"]]
-        for route in routes:
-            routes_data.append([
-                route.id,
-                "citycircuit",
-                route.name,
-                route.description,
-                "3"  # Bus route type in GTFS
-            ])
-        gtfs_files["routes.txt"] = self._list_to_csv(routes_data)
+        gtfs_files["routes.txt"] = self._stream_csv(self._gtfs_route_rows(routes))
         
         # stops.txt
-        stops_data = [["stop_id", "stop_name", "stop_lat", "stop_lon", "wheelchair_boarding"]]
-        for stop in all_stops.values():
-            stops_data.append([
-                stop.id,
-                stop.name,
-                str(stop.coordinates.latitude),
-                str(stop.coordinates.longitude),
-                "1" if stop.is_accessible else "0"
-            ])
-        gtfs_files["stops.txt"] = self._list_to_csv(stops_data)
+        gtfs_files["stops.txt"] = stops_txt
         
         # trips.txt
-        trips_data = [["route_id", "service_id", "trip_id", "trip_headsign"]]
-        for route in routes:
-            trips_data.append([
-                route.id,
-                "weekday",  # Simplified service
-                f"{route.id}_trip_1",
-                route.stops[-1].name if route.stops else ""
-            ])
-        gtfs_files["trips.txt"] = self._list_to_csv(trips_data)
+        gtfs_files["trips.txt"] = trips_txt
         
         # stop_times.txt
-        stop_times_data = [["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"]]
-        for route in routes:
-            trip_id = f"{route.id}_trip_1"
-            for i, stop in enumerate(route.stops):
-                # Simplified timing - assume 5 minutes between stops
-                minutes = i * 5
-                time_str = f"08:{minutes:02d}:00"
-                stop_times_data.append([
-                    trip_id,
-                    time_str,
-                    time_str,
-                    stop.id,
-                    str(i + 1)
-                ])
-        gtfs_files["stop_times.txt"] = self._list_to_csv(stop_times_data)
+        gtfs_files["stop_times.txt"] = stop_times_txt
         
         # calendar.txt (simplified)
-        calendar_data = [
-            ["service_id", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", "start_date", "end_date"],
-            ["weekday", "1", "1", "1", "1", "1", "0", "0", "20240101", "20241231"]
-        ]
-        gtfs_files["calendar.txt"] = self._list_to_csv(calendar_data)
+        gtfs_files["calendar.txt"] = _join_csv_rows(self._gtfs_calendar_rows())
         
         result = {
             "format": ExportFormat.GTFS.value,
@@ -169,6 +546,155 @@ class DataExporter:
         
         return result
     
+    def _gtfs_trips_stops_and_stop_times(self, routes: List[Route]) -> Tuple[str, str, str]:
+        """Build trips.txt, stops.txt (first occurrence of each stop ID) and stop_times.txt in one pass"""
+        q = _csv_field
+        trip_lines = ["route_id,service_id,trip_id,trip_headsign" + _CSV_LINE_TERMINATOR]
+        stops_output = StringIO(newline='')
+        stop_times_output = StringIO(newline='')
+        stops_writer = _csv_writer(stops_output)
+        stop_times_writer = _csv_writer(stop_times_output)
+        
+        stops_writer.writerow(["stop_id", "stop_name", "stop_lat", "stop_lon", "wheelchair_boarding"])
+        stop_times_writer.writerow(["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"])
+        
+        seen_stop_ids: Set[str] = set()
+        mark_seen = seen_stop_ids.add
+        write_stop = stops_writer.writerow
+        write_stop_time = stop_times_writer.writerow
+        for route in routes:
+            trip_id = f"{route.id}_trip_1"
+            headsign = route.stops[-1].name if route.stops else ""
+            trip_lines.append(f"{q(route.id)},weekday,{q(trip_id)},{q(headsign)}{_CSV_LINE_TERMINATOR}")
+            
+            times = _gtfs_trip_times(len(route.stops))
+            for i, stop in enumerate(route.stops):
+                stop_id = stop.id
+                if stop_id not in seen_stop_ids:
+                    mark_seen(stop_id)
+                    write_stop(self._gtfs_stop_row(stop))
+                write_stop_time(self._gtfs_stop_time_row(trip_id, i, stop, times[i]))
+        
+        return "".join(trip_lines), stops_output.getvalue(), stop_times_output.getvalue()
+    
+    def export_gtfs_zip(self, routes: List[Route], compresslevel: int = 6) -> Dict[str, Any]:
+        """
+        Export routes as a GTFS feed packaged in a single .zip archive
+        
+        Args:
+            routes: List of routes to export
+            compresslevel: Deflate level, from 1 (fastest) to 9 (smallest)
+            
+        Returns:
+            Dictionary containing the zip archive bytes
+        """
+        return self._export_gtfs_zip(routes, compresslevel)
+    
+    def _export_gtfs_zip(self, routes: List[Route], compresslevel: int = 6) -> Dict[str, Any]:
+        """Write each GTFS file straight into a deflated in-memory zip archive"""
+        # ZipFile allows only one member open for writing at a time, so
+        # stops.txt and stop_times.txt are produced by separate passes here
+        gtfs_tables = [
+            ("agency.txt", self._gtfs_agency_rows()),
+            ("routes.txt", self._gtfs_route_rows(routes)),
+            ("stops.txt", self._gtfs_stop_rows(routes)),
+            ("trips.txt", self._gtfs_trip_rows(routes)),
+            ("stop_times.txt", self._gtfs_stop_time_rows(routes)),
+            ("calendar.txt", self._gtfs_calendar_rows()),
+        ]
+        
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED,
+                             compresslevel=compresslevel) as zf:
+            for filename, rows in gtfs_tables:
+                with zf.open(filename, 'w') as member:
+                    text = TextIOWrapper(member, encoding='utf-8', newline='')
+                    writer = _csv_writer(text)
+                    for row in rows:
+                        writer.writerow(row)
+                    text.flush()
+                    text.detach()
+        
+        return {
+            "format": ExportFormat.GTFS.value,
+            "zip": buffer.getvalue(),
+            "file_count": len(gtfs_tables)
+        }
+    
+    def _gtfs_agency_rows(self) -> Iterator[List[str]]:
+        """Rows of agency.txt"""
+        yield ["agency_id", "agency_name", "agency_url", "agency_timezone"]
+        yield ["citycircuit", "CityCircuit Transport", "https://citycircuit.com", "Asia/Kolkata"]
+    
+    def _gtfs_route_rows(self, routes: List[Route]) -> Iterator[List[str]]:
+        """Rows of routes.txt"""
+        yield ["route_id", "agency_id", "route_short_name", "route_long_name", "route_type"]
+        for route in routes:
+            yield [
+                route.id,
+                "citycircuit",
+                route.name,
+                route.description,
+                "3"  # Bus route type in GTFS
+            ]
+    
+    def _gtfs_trip_rows(self, routes: List[Route]) -> Iterator[List[str]]:
+        """Rows of trips.txt"""
+        yield ["route_id", "service_id", "trip_id", "trip_headsign"]
+        for route in routes:
+            yield [
+                route.id,
+                "weekday",  # Simplified service
+                f"{route.id}_trip_1",
+                route.stops[-1].name if route.stops else ""
+            ]
+    
+    def _gtfs_calendar_rows(self) -> Iterator[List[str]]:
+        """Rows of calendar.txt (simplified)"""
+        yield ["service_id", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", "start_date", "end_date"]
+        yield ["weekday", "1", "1", "1", "1", "1", "0", "0", "20240101", "20241231"]
+    
+    def _gtfs_stop_rows(self, routes: List[Route]) -> Iterator[List[Any]]:
+        """Rows of stops.txt, keeping the first occurrence of each stop ID"""
+        yield ["stop_id", "stop_name", "stop_lat", "stop_lon", "wheelchair_boarding"]
+        seen_stop_ids: Set[str] = set()
+        mark_seen = seen_stop_ids.add
+        for route in routes:
+            for stop in route.stops:
+                stop_id = stop.id
+                if stop_id not in seen_stop_ids:
+                    mark_seen(stop_id)
+                    yield self._gtfs_stop_row(stop)
+    
+    def _gtfs_stop_time_rows(self, routes: List[Route]) -> Iterator[List[Any]]:
+        """Rows of stop_times.txt"""
+        yield ["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"]
+        for route in routes:
+            trip_id = f"{route.id}_trip_1"
+            times = _gtfs_trip_times(len(route.stops))
+            for i, stop in enumerate(route.stops):
+                yield self._gtfs_stop_time_row(trip_id, i, stop, times[i])
+    
+    def _gtfs_stop_row(self, stop: BusStop) -> List[Any]:
+        """Single stops.txt row (numbers are formatted by csv.writer)"""
+        return [
+            stop.id,
+            stop.name,
+            stop.coordinates.latitude,
+            stop.coordinates.longitude,
+            "1" if stop.is_accessible else "0"
+        ]
+    
+    def _gtfs_stop_time_row(self, trip_id: str, index: int, stop: BusStop, time_str: str) -> List[Any]:
+        """Single stop_times.txt row (numbers are formatted by csv.writer)"""
+        return [
+            trip_id,
+            time_str,
+            time_str,
+            stop.id,
+            index + 1
+        ]
+    
     def _export_json(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
         """Export routes in JSON format"""
         from models import serialize_model
@@ -182,10 +708,7 @@ class DataExporter:
             "format": ExportFormat.JSON.value,
             "data": {
                 "routes": routes_data,
-                "export_info": {
-                    "total_routes": len(routes),
-                    "total_stops": sum(len(route.stops) for route in routes)
-                }
+                "export_info": self._json_export_info(routes)
             }
         }
         
@@ -194,49 +717,106 @@ class DataExporter:
         
         return result
     
-    def _export_csv(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
-        """Export routes in CSV format"""
-        # Routes CSV
-        routes_csv_data = [
-            ["route_id", "name", "description", "operator_id", "estimated_travel_time", "optimization_score", "stop_count"]
-        ]
-        
+    def _json_export_info(self, routes: List[Route]) -> Dict[str, Any]:
+        """Summary block embedded in JSON route exports"""
+        return {
+            "total_routes": len(routes),
+            "total_stops": sum(len(route.stops) for route in routes)
+        }
+    
+    def _iter_jsonl_lines(self, routes: List[Route]):
+        """Yield each route encoded as a single JSON line (without newline)"""
         for route in routes:
-            routes_csv_data.append([
-                route.id,
-                route.name,
-                route.description,
-                route.operator_id,
-                str(route.estimated_travel_time),
-                str(route.optimization_score),
-                str(len(route.stops))
-            ])
+            yield route.__pydantic_serializer__.to_json(route)
+    
+    def _export_jsonl(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
+        """Export routes in JSON Lines format"""
+        lines = [line.decode('utf-8') for line in self._iter_jsonl_lines(routes)]
         
-        # Stops CSV
-        stops_csv_data = [
-            ["stop_id", "route_id", "stop_name", "latitude", "longitude", "address", "amenities", "daily_passenger_count", "is_accessible", "stop_sequence"]
-        ]
+        result = {
+            "format": ExportFormat.JSONL.value,
+            "data": "\n".join(lines) + ("\n" if lines else ""),
+            "line_count": len(lines)
+        }
+        
+        if include_metadata:
+            result["metadata"] = self._generate_export_metadata(routes, ExportFormat.JSONL)
+        
+        return result
+    
+    def _export_parquet(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
+        """Export routes as zstd-compressed Parquet tables (base64-encoded for transport)"""
+        if pa is None:
+            raise ImportError("Parquet export requires pyarrow to be installed")
+        
+        # One column per field, filled in a single pass over the routes
+        route_columns = {name: [] for name in PARQUET_ROUTE_SCHEMA.names}
+        stop_columns = {name: [] for name in PARQUET_STOP_SCHEMA.names}
         
         for route in routes:
+            route_columns["route_id"].append(route.id)
+            route_columns["name"].append(route.name)
+            route_columns["description"].append(route.description)
+            route_columns["operator_id"].append(route.operator_id)
+            route_columns["estimated_travel_time"].append(route.estimated_travel_time)
+            route_columns["optimization_score"].append(route.optimization_score)
+            
             for i, stop in enumerate(route.stops):
-                stops_csv_data.append([
-                    stop.id,
-                    route.id,
-                    stop.name,
-                    str(stop.coordinates.latitude),
-                    str(stop.coordinates.longitude),
-                    stop.address,
-                    ";".join(stop.amenities),
-                    str(stop.daily_passenger_count),
-                    str(stop.is_accessible),
-                    str(i + 1)
-                ])
+                stop_columns["stop_id"].append(stop.id)
+                stop_columns["route_id"].append(route.id)
+                stop_columns["stop_name"].append(stop.name)
+                stop_columns["latitude"].append(stop.coordinates.latitude)
+                stop_columns["longitude"].append(stop.coordinates.longitude)
+                stop_columns["address"].append(stop.address)
+                stop_columns["amenities"].append(stop.amenities)
+                stop_columns["daily_passenger_count"].append(stop.daily_passenger_count)
+                stop_columns["is_accessible"].append(stop.is_accessible)
+                stop_columns["stop_sequence"].append(i + 1)
+        
+        result = {
+            "format": ExportFormat.PARQUET.value,
+            "encoding": "base64",
+            "files": {
+                "routes.parquet": self._table_to_parquet(route_columns, PARQUET_ROUTE_SCHEMA),
+                "stops.parquet": self._table_to_parquet(stop_columns, PARQUET_STOP_SCHEMA)
+            }
+        }
+        
+        if include_metadata:
+            result["metadata"] = self._generate_export_metadata(routes, ExportFormat.PARQUET)
+        
+        return result
+    
+    def _table_to_parquet(self, columns: Dict[str, list], schema) -> str:
+        """Write columns as a Parquet file and return it base64-encoded"""
+        table = pa.Table.from_pydict(columns, schema=schema)
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink, compression='zstd', use_dictionary=True, row_group_size=65536)
+        return base64.b64encode(sink.getvalue().to_pybytes()).decode('ascii')
+    
+    def _export_csv(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
+        """Export routes in CSV format"""
+        # Routes CSV - every column is a plain string or number, so lines are
+        # formatted directly rather than through csv.writer
+        q = _csv_field
+        lines = ["route_id,name,description,operator_id,estimated_travel_time,optimization_score,stop_count" + _CSV_LINE_TERMINATOR]
+        append = lines.append
+        for route in routes:
+            append(f"{q(route.id)},{q(route.name)},{q(route.description)},{q(route.operator_id)},"
+                   f"{route.estimated_travel_time},{route.optimization_score},{len(route.stops)}{_CSV_LINE_TERMINATOR}")
+        routes_csv = "".join(lines)
+        
+        # Stops CSV
+        stops_csv = self._stream_csv(chain(
+            [_STOPS_CSV_HEADER],
+            self._csv_stop_rows(routes)
+        ))
         
         result = {
             "format": ExportFormat.CSV.value,
             "files": {
-                "routes.csv": self._list_to_csv(routes_csv_data),
-                "stops.csv": self._list_to_csv(stops_csv_data)
+                "routes.csv": routes_csv,
+                "stops.csv": stops_csv
             }
         }
         
@@ -245,121 +825,229 @@ class DataExporter:
         
         return result
     
+    def _csv_stop_rows(self, routes: List[Route]) -> Iterator[List[Any]]:
+        """Yield stops.csv rows for every stop of every route (numbers are formatted by csv.writer)"""
+        # Stops shared between routes have their amenities joined only once per export
+        amenities_by_stop_id: Dict[str, str] = {}
+        for route in routes:
+            for i, stop in enumerate(route.stops):
+                amenities = amenities_by_stop_id.get(stop.id)
+                if amenities is None:
+                    amenities = amenities_by_stop_id[stop.id] = ";".join(stop.amenities)
+                yield [
+                    stop.id,
+                    route.id,
+                    stop.name,
+                    stop.coordinates.latitude,
+                    stop.coordinates.longitude,
+                    stop.address,
+                    amenities,
+                    stop.daily_passenger_count,
+                    stop.is_accessible,
+                    i + 1
+                ]
+    
     def _sanitize_xml_text(self, text: str) -> str:
-        """Sanitize text for XML by removing invalid characters"""
+        """Sanitize text for XML by replacing invalid characters with '?'"""
         if not text:
             return ""
         
-        # Remove or replace invalid XML characters
-        # Valid XML characters: #x9 | #xA | #xD | [#x20-#xD7FF] | [#xE000-#xFFFD] | [#x10000-#x10FFFF]
-        valid_chars = []
-        for char in text:
-            code = ord(char)
-            if (code == 0x09 or code == 0x0A or code == 0x0D or 
-                (0x20 <= code <= 0xD7FF) or 
-                (0xE000 <= code <= 0xFFFD) or 
-                (0x10000 <= code <= 0x10FFFF)):
-                valid_chars.append(char)
-            else:
-                valid_chars.append('?')  # Replace invalid chars with ?
+        # Plain ASCII without control characters (the common case) passes through untouched
+        if text.isascii() and _XML_ASCII_CONTROL_CHARS.isdisjoint(text):
+            return text
         
-        return ''.join(valid_chars)
+        return text.translate(_XML_INVALID_TABLE)
 
     def _export_xml(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
         """Export routes in XML format"""
-        root = ET.Element("transportation_data")
+        # Elements are streamed straight to the output buffer; no tree is built
+        timestamp = datetime.now(timezone.utc).isoformat()
+        if LET is not None:
+            output = BytesIO()
+            with LET.xmlfile(output, encoding='utf-8') as xf:
+                self._write_xml_document(xf, routes, include_metadata, timestamp)
+            xml_string = output.getvalue().decode('utf-8')
+        else:
+            output = StringIO()
+            self._write_xml_document(_XMLStreamWriter(output), routes, include_metadata, timestamp)
+            xml_string = output.getvalue()
+        
+        result = {
+            "format": ExportFormat.XML.value,
+            "data": xml_string
+        }
         
         if include_metadata:
-            metadata_elem = ET.SubElement(root, "metadata")
-            ET.SubElement(metadata_elem, "export_timestamp").text = datetime.now(timezone.utc).isoformat()
-            ET.SubElement(metadata_elem, "total_routes").text = str(len(routes))
-            ET.SubElement(metadata_elem, "format").text = ExportFormat.XML.value
+            result["metadata"] = self._generate_export_metadata(routes, ExportFormat.XML, timestamp)
         
-        routes_elem = ET.SubElement(root, "routes")
+        return result
+    
+    def _write_xml_document(self, xf, routes: List[Route], include_metadata: bool, timestamp: str):
+        """Write the transportation_data document to an xmlfile-style writer"""
+        def leaf(tag: str, text: str):
+            with xf.element(tag):
+                if text:
+                    xf.write(text)
+        
+        # lxml can serialize a whole prebuilt <stop> in C, so one element is refilled per stop
+        stop_template = None if isinstance(xf, _XMLStreamWriter) else _XMLStopTemplate()
+        
+        # Sanitized amenities per stop ID, so stops shared between routes are sanitized once
+        amenities_by_stop_id: Dict[str, List[str]] = {}
+        
+        def stop_amenities(stop: BusStop) -> List[str]:
+            amenities = amenities_by_stop_id.get(stop.id)
+            if amenities is None:
+                amenities = amenities_by_stop_id[stop.id] = [
+                    self._sanitize_xml_text(amenity) for amenity in stop.amenities
+                ]
+            return amenities
+        
+        with xf.element("transportation_data"):
+            if include_metadata:
+                with xf.element("metadata"):
+                    leaf("export_timestamp", timestamp)
+                    leaf("total_routes", str(len(routes)))
+                    leaf("format", ExportFormat.XML.value)
+            
+            with xf.element("routes"):
+                for route in routes:
+                    with xf.element("route", {"id": self._sanitize_xml_text(route.id)}):
+                        leaf("name", self._sanitize_xml_text(route.name))
+                        leaf("description", self._sanitize_xml_text(route.description))
+                        leaf("operator_id", self._sanitize_xml_text(route.operator_id))
+                        leaf("estimated_travel_time", str(route.estimated_travel_time))
+                        leaf("optimization_score", str(route.optimization_score))
+                        
+                        with xf.element("stops"):
+                            for i, stop in enumerate(route.stops):
+                                if stop_template is not None:
+                                    xf.write(stop_template.fill(stop, i + 1, self._sanitize_xml_text, stop_amenities(stop)))
+                                    continue
+                                
+                                with xf.element("stop", {"id": self._sanitize_xml_text(stop.id), "sequence": str(i + 1)}):
+                                    leaf("name", self._sanitize_xml_text(stop.name))
+                                    leaf("latitude", str(stop.coordinates.latitude))
+                                    leaf("longitude", str(stop.coordinates.longitude))
+                                    leaf("address", self._sanitize_xml_text(stop.address))
+                                    leaf("daily_passenger_count", str(stop.daily_passenger_count))
+                                    leaf("is_accessible", str(stop.is_accessible))
+                                    
+                                    with xf.element("amenities"):
+                                        for amenity in stop_amenities(stop):
+                                            leaf("amenity", amenity)
+    
+    def _export_geojson(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
+        """Export routes in GeoJSON format"""
+        # Routes become LineString features and each unique stop a Point feature,
+        # collected in a single pass; route features are listed first
+        features = []
+        point_features = []
+        seen_stop_ids = set()
+        add_route_feature = features.append
+        add_point_feature = point_features.append
         
         for route in routes:
-            route_elem = ET.SubElement(routes_elem, "route")
-            route_elem.set("id", self._sanitize_xml_text(route.id))
-            
-            ET.SubElement(route_elem, "name").text = self._sanitize_xml_text(route.name)
-            ET.SubElement(route_elem, "description").text = self._sanitize_xml_text(route.description)
-            ET.SubElement(route_elem, "operator_id").text = self._sanitize_xml_text(route.operator_id)
-            ET.SubElement(route_elem, "estimated_travel_time").text = str(route.estimated_travel_time)
-            ET.SubElement(route_elem, "optimization_score").text = str(route.optimization_score)
+            stops = route.stops
+            if len(stops) >= 2:
+                feature = {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "LineString",
+                        "coordinates": [[stop.coordinates.longitude, stop.coordinates.latitude] for stop in stops]
+                    },
+                    "properties": {
+                        "route_id": route.id,
+                        "name": route.name,
+                        "description": route.description,
+                        "operator_id": route.operator_id,
+                        "estimated_travel_time": route.estimated_travel_time,
+                        "optimization_score": route.optimization_score,
+                        "stop_count": len(stops)
+                    }
+                }
+                add_route_feature(feature)
             
-            stops_elem = ET.SubElement(route_elem, "stops")
-            for i, stop in enumerate(route.stops):
-                stop_elem = ET.SubElement(stops_elem, "stop")
-                stop_elem.set("id", self._sanitize_xml_text(stop.id))
-                stop_elem.set("sequence", str(i + 1))
+            for stop in stops:
+                if stop.id in seen_stop_ids:
+                    continue
+                seen_stop_ids.add(stop.id)
                 
-                ET.SubElement(stop_elem, "name").text = self._sanitize_xml_text(stop.name)
-                ET.SubElement(stop_elem, "latitude").text = str(stop.coordinates.latitude)
-                ET.SubElement(stop_elem, "longitude").text = str(stop.coordinates.longitude)
-                ET.SubElement(stop_elem, "address").text = self._sanitize_xml_text(stop.address)
-                ET.SubElement(stop_elem, "daily_passenger_count").text = str(stop.daily_passenger_count)
-                ET.SubElement(stop_elem, "is_accessible").text = str(stop.is_accessible)
-                
-                amenities_elem = ET.SubElement(stop_elem, "amenities")
-                for amenity in stop.amenities:
-                    ET.SubElement(amenities_elem, "amenity").text = self._sanitize_xml_text(amenity)
+                coordinates = stop.coordinates
+                feature = {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [coordinates.longitude, coordinates.latitude]
+                    },
+                    "properties": {
+                        "stop_id": stop.id,
+                        "name": stop.name,
+                        "address": stop.address,
+                        "amenities": stop.amenities,
+                        "daily_passenger_count": stop.daily_passenger_count,
+                        "is_accessible": stop.is_accessible
+                    }
+                }
+                add_point_feature(feature)
         
-        xml_string = ET.tostring(root, encoding='unicode', method='xml')
+        features.extend(point_features)
+        
+        geojson_data = {
+            "type": "FeatureCollection",
+            "features": features
+        }
         
         result = {
-            "format": ExportFormat.XML.value,
-            "data": xml_string
+            "format": ExportFormat.GEOJSON.value,
+            "data": geojson_data
         }
         
         if include_metadata:
-            result["metadata"] = self._generate_export_metadata(routes, ExportFormat.XML)
+            result["metadata"] = self._generate_export_metadata(routes, ExportFormat.GEOJSON)
         
         return result
     
-    def _export_geojson(self, routes: List[Route], include_metadata: bool) -> Dict[str, Any]:
-        """Export routes in GeoJSON format"""
+    def _export_geojson_numpy(self, routes: List[Route], include_metadata: bool) -> bytes:
+        """Export routes in GeoJSON format with NumPy coordinate arrays, encoded once"""
         features = []
+        point_features = []
+        seen_stop_ids = set()
+        point_stops = []
         
-        # Export routes as LineString features
         for route in routes:
-            if len(route.stops) < 2:
-                continue
+            stops = route.stops
+            if len(stops) >= 2:
+                features.append({
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "LineString",
+                        "coordinates": self._stop_lon_lat(stops)
+                    },
+                    "properties": {
+                        "route_id": route.id,
+                        "name": route.name,
+                        "description": route.description,
+                        "operator_id": route.operator_id,
+                        "estimated_travel_time": route.estimated_travel_time,
+                        "optimization_score": route.optimization_score,
+                        "stop_count": len(stops)
+                    }
+                })
             
-            coordinates = []
-            for stop in route.stops:
-                coordinates.append([stop.coordinates.longitude, stop.coordinates.latitude])
-            
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": coordinates
-                },
-                "properties": {
-                    "route_id": route.id,
-                    "name": route.name,
-                    "description": route.description,
-                    "operator_id": route.operator_id,
-                    "estimated_travel_time": route.estimated_travel_time,
-                    "optimization_score": route.optimization_score,
-                    "stop_count": len(route.stops)
-                }
-            }
-            features.append(feature)
-        
-        # Export stops as Point features
-        all_stops = {}
-        for route in routes:
-            for stop in route.stops:
-                if stop.id not in all_stops:
-                    all_stops[stop.id] = stop
-        
-        for stop in all_stops.values():
-            feature = {
+            for stop in stops:
+                if stop.id not in seen_stop_ids:
+                    seen_stop_ids.add(stop.id)
+                    point_stops.append(stop)
+        
+        # One array for every unique stop; each Point feature gets a row view
+        point_coordinates = self._stop_lon_lat(point_stops)
+        for stop, coordinates in zip(point_stops, point_coordinates):
+            point_features.append({
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
-                    "coordinates": [stop.coordinates.longitude, stop.coordinates.latitude]
+                    "coordinates": coordinates
                 },
                 "properties": {
                     "stop_id": stop.id,
@@ -369,23 +1057,30 @@ class DataExporter:
                     "daily_passenger_count": stop.daily_passenger_count,
                     "is_accessible": stop.is_accessible
                 }
-            }
-            features.append(feature)
+            })
         
-        geojson_data = {
-            "type": "FeatureCollection",
-            "features": features
-        }
+        features.extend(point_features)
         
         result = {
             "format": ExportFormat.GEOJSON.value,
-            "data": geojson_data
+            "data": {
+                "type": "FeatureCollection",
+                "features": features
+            }
         }
         
         if include_metadata:
             result["metadata"] = self._generate_export_metadata(routes, ExportFormat.GEOJSON)
         
-        return result
+        return _dumps(result)
+    
+    def _stop_lon_lat(self, stops: List[BusStop]) -> np.ndarray:
+        """(n, 2) float64 array of [longitude, latitude] per stop"""
+        return np.fromiter(
+            ((stop.coordinates.longitude, stop.coordinates.latitude) for stop in stops),
+            dtype=np.dtype((np.float64, 2)),
+            count=len(stops)
+        ).reshape(len(stops), 2)
     
     def _export_optimization_results_json(self, results: List[OptimizationResult]) -> Dict[str, Any]:
         """Export optimization results in JSON format"""
@@ -396,23 +1091,32 @@ class DataExporter:
             result_dict = serialize_model(result, 'dict')
             results_data.append(result_dict)
         
+        export_info, metadata = self._optimization_results_envelope(results)
+        
         return {
             "format": ExportFormat.JSON.value,
             "data": {
                 "optimization_results": results_data,
-                "export_info": {
-                    "total_results": len(results),
-                    "export_timestamp": datetime.now(timezone.utc).isoformat()
-                }
+                "export_info": export_info
             },
-            "metadata": {
-                "export_timestamp": datetime.now(timezone.utc).isoformat(),
-                "format": ExportFormat.JSON.value,
-                "data_type": "optimization_results",
-                "total_records": len(results)
-            }
+            "metadata": metadata
         }
     
+    def _optimization_results_envelope(self, results: List[OptimizationResult]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Export info and metadata blocks for JSON optimization result exports"""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        export_info = {
+            "total_results": len(results),
+            "export_timestamp": timestamp
+        }
+        metadata = {
+            "export_timestamp": timestamp,
+            "format": ExportFormat.JSON.value,
+            "data_type": "optimization_results",
+            "total_records": len(results)
+        }
+        return export_info, metadata
+    
     def _export_optimization_results_csv(self, results: List[OptimizationResult]) -> Dict[str, Any]:
         """Export optimization results in CSV format"""
         csv_data = [
@@ -424,13 +1128,13 @@ class DataExporter:
             csv_data.append([
                 result.original_route_id,
                 result.optimized_route.id,
-                str(result.metrics.time_improvement),
-                str(result.metrics.distance_reduction),
-                str(result.metrics.passenger_coverage_increase),
-                str(result.metrics.cost_savings),
-                str(result.metrics.get_overall_score()),
+                result.metrics.time_improvement,
+                result.metrics.distance_reduction,
+                result.metrics.passenger_coverage_increase,
+                result.metrics.cost_savings,
+                result.metrics.get_overall_score(),
                 result.generated_at.isoformat(),
-                str(result.is_improvement())
+                result.is_improvement()
             ])
         
         return {
@@ -446,17 +1150,55 @@ class DataExporter:
     
     def _list_to_csv(self, data: List[List[str]]) -> str:
         """Convert list of lists to CSV string"""
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerows(data)
+        return self._stream_csv(data)
+    
+    def _stream_csv(self, rows: Iterable[List[str]]) -> str:
+        """Write rows to a CSV string one at a time, without materializing a row list"""
+        output, writer = self._csv_buffer()
+        writer.writerows(rows)
         return output.getvalue()
     
-    def _generate_export_metadata(self, routes: List[Route], format_type: ExportFormat) -> Dict[str, Any]:
-        """Generate metadata for exported data"""
+    def _csv_buffer(self) -> Tuple[StringIO, Any]:
+        """Return this thread's emptied CSV buffer and the writer bound to it"""
+        local = self._csv_local
+        if not hasattr(local, 'buffer'):
+            local.buffer = StringIO(newline='')
+            local.writer = _csv_writer(local.buffer)
+        else:
+            local.buffer.seek(0)
+            local.buffer.truncate(0)
+        return local.buffer, local.writer
+    
+    def yield_csv_chunks(self, rows: Iterable[List[str]], chunk_size: int = 65536) -> Iterator[str]:
+        """
+        Stream rows as CSV text chunks, e.g. as a WSGI response iterator
+        
+        Args:
+            rows: Iterable of CSV rows (header first)
+            chunk_size: Approximate number of characters buffered before a chunk is yielded
+            
+        Returns:
+            Iterator over CSV text chunks that concatenate to the full document
+        """
+        buffer = StringIO(newline='')
+        writer = _csv_writer(buffer)
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    def _generate_export_metadata(self, routes: List[Route], format_type: ExportFormat,
+                                  timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Generate metadata for exported data, reusing the export's timestamp if given"""
         total_stops = sum(len(route.stops) for route in routes)
         
         return {
-            "export_timestamp": datetime.now(timezone.utc).isoformat(),
+            "export_timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
             "format": format_type.value,
             "data_type": "routes",
             "total_routes": len(routes),
@@ -466,39 +1208,8 @@ class DataExporter:
         }
     
     def _get_format_compliance(self, format_type: ExportFormat) -> Dict[str, Any]:
-        """Get format compliance information"""
-        compliance_info = {
-            ExportFormat.GTFS: {
-                "specification": "GTFS Static",
-                "version": "1.0",
-                "compliance_level": "basic",
-                "required_files": ["agency.txt", "routes.txt", "stops.txt", "trips.txt", "stop_times.txt", "calendar.txt"]
-            },
-            ExportFormat.JSON: {
-                "specification": "CityCircuit JSON Schema",
-                "version": "1.0",
-                "compliance_level": "full"
-            },
-            ExportFormat.CSV: {
-                "specification": "CityCircuit CSV Format",
-                "version": "1.0",
-                "compliance_level": "full",
-                "files": ["routes.csv", "stops.csv"]
-            },
-            ExportFormat.XML: {
-                "specification": "CityCircuit XML Schema",
-                "version": "1.0",
-                "compliance_level": "full"
-            },
-            ExportFormat.GEOJSON: {
-                "specification": "GeoJSON RFC 7946",
-                "version": "1.0",
-                "compliance_level": "full"
-            }
-        }
-        
-        return compliance_info.get(format_type, {})
-
+        """Get format compliance information (shared, read-only)"""
+        return _FORMAT_COMPLIANCE.get(format_type, {})
 
 class DataValidator:
     """
@@ -511,7 +1222,9 @@ class DataValidator:
             ExportFormat.JSON: self._validate_json,
             ExportFormat.CSV: self._validate_csv,
             ExportFormat.XML: self._validate_xml,
-            ExportFormat.GEOJSON: self._validate_geojson
+            ExportFormat.GEOJSON: self._validate_geojson,
+            ExportFormat.JSONL: self._validate_jsonl,
+            ExportFormat.PARQUET: self._validate_parquet
         }
     
     def validate_export(self, export_data: Dict[str, Any], format_type: ExportFormat) -> Dict[str, Any]:
@@ -707,6 +1420,64 @@ class DataValidator:
             "warnings": warnings,
             "format": ExportFormat.GEOJSON.value
         }
+    
+    def _validate_jsonl(self, export_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate JSON Lines format compliance"""
+        errors = []
+        warnings = []
+        
+        if "data" not in export_data:
+            errors.append("Missing JSON Lines data")
+        elif not isinstance(export_data["data"], str):
+            errors.append("JSON Lines data must be a string")
+        else:
+            # Split on "\n" only: str.splitlines() also breaks on U+2028 etc., which JSON leaves unescaped
+            lines = [line for line in export_data["data"].split("\n") if line]
+            if not lines:
+                warnings.append("No routes found in export data")
+            for line_number, line in enumerate(lines, 1):
+                try:
+                    if not isinstance(_loads(line), dict):
+                        errors.append(f"Line {line_number} is not a JSON object")
+                except ValueError as e:
+                    errors.append(f"Invalid JSON on line {line_number}: {str(e)}")
+        
+        return {
+            "valid": len(errors) == 0,
+            "errors": errors,
+            "warnings": warnings,
+            "format": ExportFormat.JSONL.value
+        }
+    
+    def _validate_parquet(self, export_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate Parquet format compliance"""
+        errors = []
+        warnings = []
+        
+        files = export_data.get("files", {})
+        expected_schemas = {
+            "routes.parquet": PARQUET_ROUTE_SCHEMA,
+            "stops.parquet": PARQUET_STOP_SCHEMA
+        }
+        
+        for file_name, schema in expected_schemas.items():
+            if file_name not in files:
+                errors.append(f"Missing {file_name} file")
+                continue
+            
+            table = _read_parquet_file(files[file_name])
+            missing_columns = [name for name in schema.names if name not in table.column_names]
+            if missing_columns:
+                errors.append(f"{file_name} missing required columns: {', '.join(missing_columns)}")
+            elif file_name == "routes.parquet" and table.num_rows == 0:
+                warnings.append("No routes found in export data")
+        
+        return {
+            "valid": len(errors) == 0,
+            "errors": errors,
+            "warnings": warnings,
+            "format": ExportFormat.PARQUET.value
+        }
 
 
 class DataImporter:
@@ -719,7 +1490,9 @@ class DataImporter:
             ExportFormat.JSON: self._import_json,
             ExportFormat.CSV: self._import_csv,
             ExportFormat.XML: self._import_xml,
-            ExportFormat.GEOJSON: self._import_geojson
+            ExportFormat.GEOJSON: self._import_geojson,
+            ExportFormat.JSONL: self._import_jsonl,
+            ExportFormat.PARQUET: self._import_parquet
         }
     
     def import_route_data(self, export_data: Dict[str, Any], format_type: ExportFormat) -> List[Route]:
@@ -752,6 +1525,64 @@ class DataImporter:
         
         return routes
     
+    def _import_jsonl(self, export_data: Dict[str, Any]) -> List[Route]:
+        """Import routes from JSON Lines format"""
+        from models import deserialize_model
+        
+        data = export_data.get("data", "")
+        
+        routes = []
+        for line in data.split("\n"):
+            if line.strip():
+                routes.append(deserialize_model(Route, _loads(line), 'dict'))
+        
+        return routes
+    
+    def _import_parquet(self, export_data: Dict[str, Any]) -> List[Route]:
+        """Import routes from Parquet format"""
+        files = export_data.get("files", {})
+        
+        if "routes.parquet" not in files or "stops.parquet" not in files:
+            raise ValueError("Missing required Parquet files for import")
+        
+        routes_columns = _read_parquet_file(files["routes.parquet"]).to_pydict()
+        stops_columns = _read_parquet_file(files["stops.parquet"]).to_pydict()
+        
+        # Stops are stored in route order, so appending preserves stop_sequence
+        stops_by_route = {route_id: [] for route_id in routes_columns["route_id"]}
+        for stop_id, route_id, name, lat, lon, address, amenities, passengers, accessible in zip(
+                stops_columns["stop_id"], stops_columns["route_id"], stops_columns["stop_name"],
+                stops_columns["latitude"], stops_columns["longitude"], stops_columns["address"],
+                stops_columns["amenities"], stops_columns["daily_passenger_count"],
+                stops_columns["is_accessible"]):
+            if route_id in stops_by_route:
+                stops_by_route[route_id].append(BusStop(
+                    id=stop_id,
+                    name=name,
+                    coordinates=Coordinates(latitude=lat, longitude=lon),
+                    address=address,
+                    amenities=amenities or [],
+                    daily_passenger_count=passengers,
+                    is_accessible=accessible
+                ))
+        
+        routes = []
+        for route_id, name, description, operator_id, travel_time, score in zip(
+                routes_columns["route_id"], routes_columns["name"], routes_columns["description"],
+                routes_columns["operator_id"], routes_columns["estimated_travel_time"],
+                routes_columns["optimization_score"]):
+            routes.append(Route(
+                id=route_id,
+                name=name,
+                description=description,
+                stops=stops_by_route[route_id],
+                operator_id=operator_id,
+                estimated_travel_time=travel_time,
+                optimization_score=score
+            ))
+        
+        return routes
+    
     def _import_csv(self, export_data: Dict[str, Any]) -> List[Route]:
         """Import routes from CSV format"""
         files = export_data.get("files", {})
@@ -759,113 +1590,106 @@ class DataImporter:
         if "routes.csv" not in files or "stops.csv" not in files:
             raise ValueError("Missing required CSV files for import")
         
-        # Parse routes CSV
-        routes_csv = files["routes.csv"]
-        routes_reader = csv.DictReader(StringIO(routes_csv))
-        routes_dict = {}
-        
-        for row in routes_reader:
-            route_id = row["route_id"]
-            routes_dict[route_id] = {
-                "id": route_id,
-                "name": row["name"],
-                "description": row["description"],
-                "operator_id": row["operator_id"],
-                "estimated_travel_time": int(row["estimated_travel_time"]),
-                "optimization_score": float(row["optimization_score"]),
-                "stops": []
-            }
-        
-        # Parse stops CSV and associate with routes
-        stops_csv = files["stops.csv"]
-        stops_reader = csv.DictReader(StringIO(stops_csv))
-        
-        for row in stops_reader:
-            route_id = row["route_id"]
-            if route_id in routes_dict:
-                stop = BusStop(
-                    name=row["stop_name"],
-                    coordinates=Coordinates(
-                        latitude=float(row["latitude"]),
-                        longitude=float(row["longitude"])
-                    ),
-                    address=row["address"],
-                    amenities=row["amenities"].split(";") if row["amenities"] else [],
-                    daily_passenger_count=int(row["daily_passenger_count"]),
-                    is_accessible=row["is_accessible"].lower() == "true"
-                )
-                routes_dict[route_id]["stops"].append(stop)
-        
-        # Create Route objects
+        routes_columns = _read_csv_columns(files["routes.csv"], _ROUTES_CSV_DTYPES)
+        stops_columns = _read_csv_columns(files["stops.csv"], _STOPS_CSV_DTYPES)
+        
+        # Stops are grouped by route first; stops.csv is in route order, so appending
+        # preserves stop_sequence
+        stops_by_route = {route_id: [] for route_id in routes_columns["route_id"]}
+        for route_id, name, lat, lon, address, amenities, passengers, accessible in zip(
+                stops_columns["route_id"], stops_columns["stop_name"], stops_columns["latitude"],
+                stops_columns["longitude"], stops_columns["address"], stops_columns["amenities"],
+                stops_columns["daily_passenger_count"], stops_columns["is_accessible"]):
+            if route_id in stops_by_route:
+                stops_by_route[route_id].append(BusStop(
+                    name=name,
+                    coordinates=Coordinates(latitude=lat, longitude=lon),
+                    address=address,
+                    amenities=amenities.split(";") if amenities else [],
+                    daily_passenger_count=passengers,
+                    is_accessible=accessible.lower() == "true"
+                ))
+        
+        # Routes are then built straight from their CSV columns
         routes = []
-        for route_data in routes_dict.values():
-            route = Route(
-                name=route_data["name"],
-                description=route_data["description"],
-                stops=route_data["stops"],
-                operator_id=route_data["operator_id"],
-                estimated_travel_time=route_data["estimated_travel_time"],
-                optimization_score=route_data["optimization_score"]
-            )
-            routes.append(route)
+        for route_id, name, description, operator_id, travel_time, score in zip(
+                routes_columns["route_id"], routes_columns["name"], routes_columns["description"],
+                routes_columns["operator_id"], routes_columns["estimated_travel_time"],
+                routes_columns["optimization_score"]):
+            routes.append(Route(
+                name=name,
+                description=description,
+                stops=stops_by_route[route_id],
+                operator_id=operator_id,
+                estimated_travel_time=travel_time,
+                optimization_score=score
+            ))
         
         return routes
     
     def _import_xml(self, export_data: Dict[str, Any]) -> List[Route]:
         """Import routes from XML format"""
         xml_data = export_data.get("data", "")
-        root = ET.fromstring(xml_data)
+        if isinstance(xml_data, str):
+            xml_data = xml_data.encode('utf-8')
         
         routes = []
-        routes_elem = root.find("routes")
-        
-        if routes_elem is not None:
-            for route_elem in routes_elem.findall("route"):
-                stops = []
-                stops_elem = route_elem.find("stops")
-                
-                if stops_elem is not None:
-                    for stop_elem in stops_elem.findall("stop"):
-                        amenities = []
-                        amenities_elem = stop_elem.find("amenities")
-                        if amenities_elem is not None:
-                            amenities = [amenity.text for amenity in amenities_elem.findall("amenity")]
-                        
-                        stop = BusStop(
-                            name=stop_elem.find("name").text,
-                            coordinates=Coordinates(
-                                latitude=float(stop_elem.find("latitude").text),
-                                longitude=float(stop_elem.find("longitude").text)
-                            ),
-                            address=stop_elem.find("address").text,
-                            amenities=amenities,
-                            daily_passenger_count=int(stop_elem.find("daily_passenger_count").text),
-                            is_accessible=stop_elem.find("is_accessible").text.lower() == "true"
-                        )
-                        stops.append(stop)
-                
-                route = Route(
-                    name=route_elem.find("name").text or "",
-                    description=route_elem.find("description").text or "",
-                    stops=stops,
-                    operator_id=route_elem.find("operator_id").text or "unknown",
-                    estimated_travel_time=int(route_elem.find("estimated_travel_time").text or "0"),
-                    optimization_score=float(route_elem.find("optimization_score").text or "0.0")
+        # Routes are parsed one at a time and discarded once built, so the whole tree
+        # is never held in memory
+        for route_elem in self._iter_xml_routes(BytesIO(xml_data)):
+            stops = []
+            for stop_elem in route_elem.iterfind("stops/stop"):
+                stop = BusStop(
+                    name=stop_elem.findtext("name"),
+                    coordinates=Coordinates(
+                        latitude=float(stop_elem.findtext("latitude")),
+                        longitude=float(stop_elem.findtext("longitude"))
+                    ),
+                    address=stop_elem.findtext("address"),
+                    amenities=[amenity.text for amenity in stop_elem.iterfind("amenities/amenity")],
+                    daily_passenger_count=int(stop_elem.findtext("daily_passenger_count")),
+                    is_accessible=stop_elem.findtext("is_accessible").lower() == "true"
                 )
-                routes.append(route)
+                stops.append(stop)
+            
+            route = Route(
+                name=route_elem.findtext("name") or "",
+                description=route_elem.findtext("description") or "",
+                stops=stops,
+                operator_id=route_elem.findtext("operator_id") or "unknown",
+                estimated_travel_time=int(route_elem.findtext("estimated_travel_time") or "0"),
+                optimization_score=float(route_elem.findtext("optimization_score") or "0.0")
+            )
+            routes.append(route)
         
         return routes
     
+    def _iter_xml_routes(self, source) -> Iterator[Any]:
+        """Yield each parsed <route> element of an XML export, freeing it after use"""
+        if LET is not None:
+            # Uploaded documents are untrusted: never expand entities or fetch external
+            # DTDs/resources (lxml 4.x resolves external entities by default)
+            for _, route_elem in LET.iterparse(source, events=('end',), tag='route',
+                                               resolve_entities=False, no_network=True, load_dtd=False):
+                yield route_elem
+                # Drop the route and any already-processed siblings from the partial tree
+                route_elem.clear()
+                while route_elem.getprevious() is not None:
+                    del route_elem.getparent()[0]
+            return
+        
+        for _, elem in ET.iterparse(source, events=('end',)):
+            if elem.tag == 'route':
+                yield elem
+                elem.clear()
+    
     def _import_geojson(self, export_data: Dict[str, Any]) -> List[Route]:
         """Import routes from GeoJSON format (limited support)"""
-        geojson_data = export_data.get("data", {})
-        features = geojson_data.get("features", [])
-        
         # Group features by route
         route_features = {}
         stop_features = {}
         
-        for feature in features:
+        for feature in self._iter_geojson_features(export_data.get("data", {})):
             geometry_type = feature.get("geometry", {}).get("type")
             properties = feature.get("properties", {})
             
@@ -905,4 +1729,16 @@ class DataImporter:
             )
             routes.append(route)
         
-        return routes
\ No newline at end of file
+        return routes
+    
+    def _iter_geojson_features(self, geojson_data: Union[Dict[str, Any], str, bytes]) -> Iterable[Dict[str, Any]]:
+        """Features of a GeoJSON FeatureCollection given as a dict or as encoded JSON"""
+        if isinstance(geojson_data, (str, bytes)):
+            if isinstance(geojson_data, str):
+                geojson_data = geojson_data.encode('utf-8')
+            if ijson is not None:
+                # Features are decoded one at a time; the collection is never held as a whole
+                return ijson.items(BytesIO(geojson_data), 'features.item', use_float=True)
+            geojson_data = _loads(geojson_data)
+        
+        return geojson_data.get("features", [])
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Spherical geometry helpers shared by the CityCircuit ML Service algorithms
+Great circle distances along stop sequences, and unit-sphere mappings for KD-tree radius queries
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy kernel is used instead
+    njit = None
+
+
+def unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """(n, 3) points on the unit sphere, where chord length grows with great circle distance"""
+    lat_r, lon_r = np.radians(lat), np.radians(lon)
+    cos_lat = np.cos(lat_r)
+    return np.column_stack((cos_lat * np.cos(lon_r), cos_lat * np.sin(lon_r), np.sin(lat_r)))
+
+
+def chord_radius(radius_km: float) -> float:
+    """Chord length on the unit sphere covering a great circle radius, padded so that
+    points on the radius are not lost to rounding before the short-range distance check"""
+    return 2 * np.sin(radius_km / 6371 / 2) * (1 + 1e-6)
+
+
+def _segment_distances_numpy(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Haversine distance in km between consecutive points"""
+    lat_r, lon_r = np.radians(lat), np.radians(lon)
+    dlat = np.diff(lat_r)
+    dlon = np.diff(lon_r)
+    a = np.sin(dlat/2)**2 + np.cos(lat_r[:-1]) * np.cos(lat_r[1:]) * np.sin(dlon/2)**2
+    return 2 * 6371 * np.arcsin(np.sqrt(a))
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def segment_distances(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Haversine distance in km between consecutive points (JIT-compiled, no temporaries)"""
+        n_segments = max(lat.shape[0] - 1, 0)
+        out = np.empty(n_segments)
+        for k in range(n_segments):
+            lat1 = np.radians(lat[k])
+            lat2 = np.radians(lat[k + 1])
+            dlat = lat2 - lat1
+            dlon = np.radians(lon[k + 1] - lon[k])
+            a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+            out[k] = 2 * 6371 * np.arcsin(np.sqrt(a))
+        return out
+else:
+    segment_distances = _segment_distances_numpy
@@ -4,7 +4,11 @@ Integrates route analysis, population analysis, and path matrix calculations
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from typing import List, Dict, Any, Optional, FrozenSet, Type
 from datetime import datetime, timezone
 
 from models.route import Route, BusStop
@@ -15,9 +19,43 @@ from models.base import Coordinates
 from .route_analyzer import RouteAnalyzer, RouteAnalysisResult
 from .population_analyzer import PopulationAnalyzer, PopulationAnalysisResult
 from .path_matrix import PathMatrixCalculator, PathMatrix, PathAlgorithm
+from .geometry import segment_distances
 
 logger = logging.getLogger(__name__)
 
+# Amenities every optimized stop gets: basic amenities, then accessibility features
+_DEFAULT_AMENITIES = ("shelter", "seating", "lighting", "wheelchair_accessible", "tactile_paving")
+
+
+# Per-process state of batch optimization workers, set by _init_optimization_worker
+_worker_engine = None
+_worker_population_data = None
+
+
+def _init_optimization_worker(engine_class: Type['OptimizationEngine'],
+                              population_data: Optional[PopulationDensityData]):
+    """Build the engine a worker process reuses for all of its routes"""
+    global _worker_engine, _worker_population_data
+    _worker_engine = engine_class()
+    _worker_population_data = population_data
+
+
+@lru_cache(maxsize=1)
+def get_optimization_engine() -> 'OptimizationEngine':
+    """
+    Process-wide shared OptimizationEngine
+    
+    Building an engine builds the route analyzer's Keras model, so callers that
+    only need an engine (or one of its analyzers) should share this one instead
+    of constructing their own.
+    """
+    return OptimizationEngine()
+
+
+def _optimize_route_worker(route: Route) -> OptimizationResult:
+    """Optimize one route in a worker process; failures are raised through its future"""
+    return _worker_engine.optimize_route(route, _worker_population_data)
+
 
 class OptimizationEngine:
     """
@@ -94,19 +132,20 @@ class OptimizationEngine:
                                 path_matrix: PathMatrix) -> Route:
         """Generate an optimized version of the route"""
         
-        # Start with the original route
-        optimized_stops = original_route.stops.copy()
+        # Apply optimizations based on analysis results, starting from the original stops
+        original_stops = original_route.stops
         
-        # Apply optimizations based on analysis results
-        
-        # 1. Optimize stop order using path matrix
-        if len(optimized_stops) > 2:
-            stop_ids = [stop.id for stop in optimized_stops]
-            optimal_order = self.path_calculator.find_optimal_route_order(path_matrix, stop_ids)
+        # 1. Optimize stop order using path matrix (a route of two stops has only one order)
+        if len(original_stops) > 2:
+            stop_dict = {stop.id: stop for stop in original_stops}
+            optimal_order = self.path_calculator.find_optimal_route_order(
+                path_matrix, [stop.id for stop in original_stops]
+            )
             
             # Reorder stops based on optimal path
-            stop_dict = {stop.id: stop for stop in optimized_stops}
             optimized_stops = [stop_dict[stop_id] for stop_id in optimal_order if stop_id in stop_dict]
+        else:
+            optimized_stops = list(original_stops)
         
         # 2. Add stops for coverage gaps if population data is available
         if population_analysis and population_analysis.coverage_gaps:
@@ -115,12 +154,13 @@ class OptimizationEngine:
             )
             optimized_stops.extend(new_stops)
         
-        # 3. Remove inefficient stops if they create bottlenecks
+        # 3. Find inefficient stops if they create bottlenecks
+        removed_indices = frozenset()
         if route_analysis.bottlenecks:
-            optimized_stops = self._remove_bottleneck_stops(optimized_stops, route_analysis.bottlenecks)
+            removed_indices = self._bottleneck_stop_indices(optimized_stops, route_analysis.bottlenecks)
         
-        # 4. Improve accessibility by prioritizing accessible stops
-        optimized_stops = self._improve_accessibility(optimized_stops)
+        # 4. Drop those stops and improve accessibility of the rest in the same pass
+        optimized_stops = self._improve_accessibility(optimized_stops, removed_indices)
         
         # 5. Calculate new travel time estimate
         new_travel_time = self._estimate_optimized_travel_time(optimized_stops, path_matrix)
@@ -166,12 +206,12 @@ class OptimizationEngine:
         
         return new_stops
     
-    def _remove_bottleneck_stops(self, stops: List[BusStop], 
-                               bottlenecks: List[Dict[str, Any]]) -> List[BusStop]:
-        """Remove stops that create significant bottlenecks"""
+    def _bottleneck_stop_indices(self, stops: List[BusStop], 
+                               bottlenecks: List[Dict[str, Any]]) -> FrozenSet[int]:
+        """Indices of stops to remove because they create significant bottlenecks"""
         # Only remove stops if we have enough stops remaining
         if len(stops) <= 3:
-            return stops
+            return frozenset()
         
         stops_to_remove = []
         
@@ -187,47 +227,32 @@ class OptimizationEngine:
                 continue
         
         # Remove identified stops (keeping at least 2 stops)
-        filtered_stops = [stop for i, stop in enumerate(stops) 
-                         if i not in stops_to_remove or len(stops) - len(stops_to_remove) < 2]
+        if len(stops) - len(stops_to_remove) < 2:
+            return frozenset()
         
-        return filtered_stops
+        return frozenset(stops_to_remove)
     
-    def _improve_accessibility(self, stops: List[BusStop]) -> List[BusStop]:
-        """Improve accessibility of stops where possible"""
-        improved_stops = []
-        
-        for stop in stops:
-            # Create an improved version of the stop
-            improved_stop = BusStop(
-                id=stop.id,
-                name=stop.name,
-                coordinates=stop.coordinates,
-                address=stop.address,
-                amenities=self._enhance_amenities(stop.amenities),
-                daily_passenger_count=stop.daily_passenger_count,
-                is_accessible=True  # Make all stops accessible in optimization
-            )
-            improved_stops.append(improved_stop)
-        
-        return improved_stops
+    def _improve_accessibility(self, stops: List[BusStop],
+                               removed_indices: FrozenSet[int] = frozenset()) -> List[BusStop]:
+        """Improve accessibility of stops where possible, skipping removed stops"""
+        # Copies share the original's fields and only replace what changes
+        return [
+            stop.model_copy(update={
+                "amenities": self._enhance_amenities(stop.amenities),
+                "is_accessible": True  # Make all stops accessible in optimization
+            })
+            for i, stop in enumerate(stops)
+            if i not in removed_indices
+        ]
     
     def _enhance_amenities(self, current_amenities: List[str]) -> List[str]:
         """Enhance amenities for better passenger experience"""
-        enhanced = current_amenities.copy()
-        
-        # Add basic amenities if not present
-        basic_amenities = ["shelter", "seating", "lighting"]
-        for amenity in basic_amenities:
-            if amenity not in enhanced:
-                enhanced.append(amenity)
+        # Basic amenities and accessibility features are appended if not present
+        if not current_amenities:
+            return list(_DEFAULT_AMENITIES)
         
-        # Add accessibility features
-        accessibility_features = ["wheelchair_accessible", "tactile_paving"]
-        for feature in accessibility_features:
-            if feature not in enhanced:
-                enhanced.append(feature)
-        
-        return enhanced
+        present = set(current_amenities)
+        return current_amenities + [amenity for amenity in _DEFAULT_AMENITIES if amenity not in present]
     
     def _estimate_optimized_travel_time(self, stops: List[BusStop], 
                                       path_matrix: PathMatrix) -> int:
@@ -235,24 +260,23 @@ class OptimizationEngine:
         if len(stops) < 2:
             return 10  # Minimum time
         
-        total_time = 0
-        
-        # Calculate time based on path matrix if stops are in matrix
-        for i in range(len(stops) - 1):
-            current_stop_id = stops[i].id
-            next_stop_id = stops[i + 1].id
-            
-            if current_stop_id in path_matrix.stop_ids and next_stop_id in path_matrix.stop_ids:
-                current_idx = path_matrix.stop_ids.index(current_stop_id)
-                next_idx = path_matrix.stop_ids.index(next_stop_id)
-                segment_time = path_matrix.time_matrix[current_idx, next_idx]
-                total_time += segment_time
-            else:
-                # Fallback calculation
-                distance = self._calculate_distance(stops[i].coordinates, stops[i + 1].coordinates)
-                segment_time = (distance / 25) * 60 + 2  # 25 km/h + 2 min stop time
-                total_time += segment_time
-        
+        # Fallback time for every segment at once: 25 km/h + 2 min stop time
+        n_stops = len(stops)
+        lat = np.fromiter((stop.coordinates.latitude for stop in stops), dtype=np.float64, count=n_stops)
+        lon = np.fromiter((stop.coordinates.longitude for stop in stops), dtype=np.float64, count=n_stops)
+        segment_times = segment_distances(lat, lon) / 25 * 60 + 2
+        
+        # Use the path matrix time instead where both stops are in the matrix
+        # (-1 marks stops that are not), gathered with one fancy-index. The matrix
+        # is stored as float32 (well under a second of error on minute values);
+        # gathered times are widened into the float64 segment array before summing
+        stop_index = path_matrix.stop_index
+        idx = np.fromiter((stop_index.get(stop.id, -1) for stop in stops), dtype=np.intp, count=n_stops)
+        from_idx, to_idx = idx[:-1], idx[1:]
+        in_matrix = (from_idx >= 0) & (to_idx >= 0)
+        segment_times[in_matrix] = path_matrix.time_matrix[from_idx[in_matrix], to_idx[in_matrix]]
+        
+        total_time = float(segment_times.sum())
         return max(10, int(total_time))  # Minimum 10 minutes
     
     def _calculate_new_optimization_score(self, original_score: float, 
@@ -325,25 +349,29 @@ class OptimizationEngine:
             bounds = GeoBounds(north=0.1, south=-0.1, east=0.1, west=-0.1)
             density_points = []
         else:
-            # Calculate bounds from route stops
-            lats = [stop.coordinates.latitude for stop in route.stops]
-            lons = [stop.coordinates.longitude for stop in route.stops]
+            # Calculate bounds from route stops, reading each stop's coordinates once
+            n_stops = len(route.stops)
+            lat_lon = np.fromiter(
+                ((stop.coordinates.latitude, stop.coordinates.longitude) for stop in route.stops),
+                dtype=np.dtype((np.float64, 2)),
+                count=n_stops
+            ).reshape(n_stops, 2)
+            (south, west), (north, east) = lat_lon.min(axis=0).tolist(), lat_lon.max(axis=0).tolist()
             
             bounds = GeoBounds(
-                north=max(lats) + 0.01,
-                south=min(lats) - 0.01,
-                east=max(lons) + 0.01,
-                west=min(lons) - 0.01
+                north=north + 0.01,
+                south=south - 0.01,
+                east=east + 0.01,
+                west=west - 0.01
             )
             
-            # Create density points from stops
+            # Create density points from stops; they all share one read-only demographic profile
+            demographic_data = DemographicData(
+                age_groups={"25-64": 60.0, "18-25": 20.0, "65+": 20.0},
+                economic_indicators={"income": 35000.0}
+            )
             density_points = []
             for stop in route.stops:
-                demographic_data = DemographicData(
-                    age_groups={"25-64": 60.0, "18-25": 20.0, "65+": 20.0},
-                    economic_indicators={"income": 35000.0}
-                )
-                
                 density_point = DensityPoint(
                     coordinates=stop.coordinates,
                     population=stop.daily_passenger_count * 10,  # Estimate catchment population
@@ -359,66 +387,97 @@ class OptimizationEngine:
             collected_at=datetime.now(timezone.utc)
         )
     
-    def _calculate_distance(self, coord1: Coordinates, coord2: Coordinates) -> float:
-        """Calculate distance between coordinates using Haversine formula"""
-        import numpy as np
-        
-        # Convert to radians
-        lat1, lon1 = np.radians(coord1.latitude), np.radians(coord1.longitude)
-        lat2, lon2 = np.radians(coord2.latitude), np.radians(coord2.longitude)
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-        c = 2 * np.arcsin(np.sqrt(a))
-        
-        return 6371 * c  # Earth's radius in km
-    
     def batch_optimize_routes(self, routes: List[Route], 
-                            population_data: Optional[PopulationDensityData] = None) -> List[OptimizationResult]:
-        """Optimize multiple routes in batch"""
-        results = []
+                            population_data: Optional[PopulationDensityData] = None,
+                            max_workers: Optional[int] = None) -> List[OptimizationResult]:
+        """
+        Optimize multiple routes in batch
         
+        Args:
+            routes: Routes to optimize
+            population_data: Optional population density data shared by all routes
+            max_workers: Worker processes to optimize routes in; None or 1 optimizes
+                in-process. Each worker loads TensorFlow and builds its own engine, so
+                this only pays off for batches that take much longer than that start-up.
+                
+        Returns:
+            Results of the routes that were optimized, in input order
+        """
         self.logger.info(f"Starting batch optimization of {len(routes)} routes")
         
-        for i, route in enumerate(routes):
+        workers = min(max_workers or 1, len(routes))
+        if workers > 1:
+            return self._batch_optimize_routes_parallel(routes, population_data, workers)
+        
+        results = []
+        for route in routes:
             try:
-                result = self.optimize_route(route, population_data)
-                results.append(result)
-                
-                if (i + 1) % 5 == 0:  # Log progress every 5 routes
-                    self.logger.info(f"Completed optimization for {i + 1}/{len(routes)} routes")
-                    
+                results.append(self.optimize_route(route, population_data))
             except Exception as e:
-                self.logger.error(f"Failed to optimize route {route.id}: {e}")
-                continue
+                self._log_route_failure(route, e)
         
-        self.logger.info(f"Batch optimization completed. {len(results)} routes optimized successfully")
+        self.logger.info(f"Batch optimization completed. {len(results)}/{len(routes)} routes optimized successfully")
         return results
     
+    def _batch_optimize_routes_parallel(self, routes: List[Route],
+                                        population_data: Optional[PopulationDensityData],
+                                        workers: int) -> List[OptimizationResult]:
+        """Optimize routes across worker processes, keeping input order"""
+        slots: List[Optional[OptimizationResult]] = [None] * len(routes)
+        
+        # Spawned rather than forked: TensorFlow and BLAS threads do not survive a fork.
+        # Workers rebuild this engine's class and receive the population data once.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_optimization_worker,
+                                 initargs=(type(self), population_data)) as executor:
+            futures = {executor.submit(_optimize_route_worker, route): i
+                       for i, route in enumerate(routes)}
+            # Failures surface only when their future is consumed, so successful
+            # routes are collected without any per-route error handling
+            for future in as_completed(futures):
+                i = futures[future]
+                error = future.exception()
+                if error is None:
+                    slots[i] = future.result()
+                else:
+                    self._log_route_failure(routes[i], error)
+        
+        results = [result for result in slots if result is not None]
+        self.logger.info(f"Batch optimization completed. {len(results)}/{len(routes)} routes optimized successfully")
+        return results
+    
+    def _log_route_failure(self, route: Route, error: BaseException):
+        """Log a failed route with its error, attaching the traceback only at DEBUG level"""
+        exc_info = error if self.logger.isEnabledFor(logging.DEBUG) else None
+        self.logger.error(f"Failed to optimize route {route.id}: {error!r}", exc_info=exc_info)
+    
     def get_optimization_summary(self, results: List[OptimizationResult]) -> Dict[str, Any]:
         """Generate summary statistics for optimization results"""
         if not results:
             return {'error': 'No optimization results provided'}
         
-        # Calculate aggregate metrics
-        total_time_improvement = sum(r.metrics.time_improvement for r in results)
-        total_distance_reduction = sum(r.metrics.distance_reduction for r in results)
-        total_coverage_increase = sum(r.metrics.passenger_coverage_increase for r in results)
-        total_cost_savings = sum(r.metrics.cost_savings for r in results)
+        # One row of metrics per result, gathered in a single pass; the last column
+        # is the overall score
+        metrics = np.array([
+            (r.metrics.time_improvement, r.metrics.distance_reduction,
+             r.metrics.passenger_coverage_increase, r.metrics.cost_savings,
+             r.metrics.get_overall_score())
+            for r in results
+        ], dtype=np.float64)
+        overall_scores = metrics[:, 4]
         
-        avg_time_improvement = total_time_improvement / len(results)
-        avg_distance_reduction = total_distance_reduction / len(results)
-        avg_coverage_increase = total_coverage_increase / len(results)
-        avg_cost_savings = total_cost_savings / len(results)
+        # Calculate aggregate metrics
+        avg_time_improvement, avg_distance_reduction, avg_coverage_increase, avg_cost_savings = (
+            metrics[:, :4].mean(axis=0).tolist()
+        )
         
-        # Find best and worst performing optimizations
-        best_result = max(results, key=lambda r: r.metrics.get_overall_score())
-        worst_result = min(results, key=lambda r: r.metrics.get_overall_score())
+        # Find best and worst performing optimizations (first one on ties)
+        best_result = results[int(overall_scores.argmax())]
+        worst_result = results[int(overall_scores.argmin())]
         
-        # Count significant improvements
-        significant_improvements = sum(1 for r in results if r.is_improvement(threshold=10.0))
+        # Count significant improvements (same threshold test as OptimizationResult.is_improvement)
+        significant_improvements = int(np.count_nonzero(overall_scores >= 10.0))
         
         summary = {
             'total_routes_optimized': len(results),
@@ -433,12 +492,12 @@ class OptimizationEngine:
             'best_optimization': {
                 'route_id': best_result.original_route_id,
                 'route_name': best_result.optimized_route.name,
-                'overall_score': round(best_result.metrics.get_overall_score(), 2)
+                'overall_score': round(float(overall_scores.max()), 2)
             },
             'worst_optimization': {
                 'route_id': worst_result.original_route_id,
                 'route_name': worst_result.optimized_route.name,
-                'overall_score': round(worst_result.metrics.get_overall_score(), 2)
+                'overall_score': round(float(overall_scores.min()), 2)
             },
             'generated_at': datetime.now(timezone.utc).isoformat()
         }
@@ -3,18 +3,262 @@ Path matrix calculation algorithms for CityCircuit ML Service
 Calculates optimal paths between bus stops using various algorithms
 """
 
+import math
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial.distance import cdist, pdist, squareform
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import logging
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property
 from enum import Enum
 
 from models.route import Route, BusStop
 from models.base import Coordinates
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the NumPy kernels are used instead
+    njit = None
+
+try:
+    import cupy as cp
+except ImportError:  # CuPy is optional; distance matrices are computed on the CPU instead
+    cp = None
+
 logger = logging.getLogger(__name__)
 
 
+def _segment_matrices_numpy(distances: np.ndarray, haversine: np.ndarray, pax: np.ndarray,
+                            acc: np.ndarray, amen: np.ndarray, time_out: np.ndarray,
+                            traffic_out: np.ndarray, difficulty_out: np.ndarray) -> None:
+    """
+    Travel time, traffic factor and difficulty score of every stop pair
+    
+    Elementwise equivalents of PathMatrixCalculator._estimate_travel_time (times
+    the traffic factor), _get_traffic_factor and _calculate_difficulty_score.
+    Travel times on the diagonal are zero.
+    """
+    avg_passengers = (pax[:, None] + pax[None, :]) / 2
+    
+    traffic = np.select([avg_passengers > 8000, avg_passengers > 5000, avg_passengers > 2000],
+                        [1.3, 1.2, 1.1], default=1.0)
+    traffic_out[:] = traffic
+    
+    # Urban bus average speed of 25 km/h, adjusted for passenger volume; driving
+    # time plus 2 minutes per stop for boarding/alighting
+    speed = np.select([avg_passengers > 5000, avg_passengers < 1000], [25 * 0.8, 25 * 1.1], default=25)
+    time_out[:] = (distances / speed * 60 + 2) * traffic
+    np.fill_diagonal(time_out, 0.0)
+    
+    # Distance, accessibility, passenger volume and amenities factors, capped at 100
+    score = np.select([haversine > 10, haversine > 5], [20.0, 10.0], default=0.0)
+    score += np.where(~(acc[:, None] & acc[None, :]), 15.0, 0.0)
+    score += np.select([avg_passengers > 8000, avg_passengers > 5000, avg_passengers < 500],
+                       [25.0, 15.0, 10.0], default=0.0)
+    total_amenities = amen[:, None] + amen[None, :]
+    score += np.select([total_amenities == 0, total_amenities < 3], [20.0, 10.0], default=0.0)
+    difficulty_out[:] = np.minimum(score, 100.0)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _segment_matrices(distances: np.ndarray, haversine: np.ndarray, pax: np.ndarray,
+                          acc: np.ndarray, amen: np.ndarray, time_out: np.ndarray,
+                          traffic_out: np.ndarray, difficulty_out: np.ndarray) -> None:
+        """Travel time, traffic factor and difficulty score of every stop pair, one row per thread"""
+        n = distances.shape[0]
+        for i in prange(n):
+            for j in range(n):
+                avg_passengers = (pax[i] + pax[j]) / 2
+                
+                if avg_passengers > 8000:
+                    traffic = 1.3
+                elif avg_passengers > 5000:
+                    traffic = 1.2
+                elif avg_passengers > 2000:
+                    traffic = 1.1
+                else:
+                    traffic = 1.0
+                traffic_out[i, j] = traffic
+                
+                if i == j:
+                    time_out[i, j] = 0.0
+                else:
+                    if avg_passengers > 5000:
+                        speed = 25 * 0.8
+                    elif avg_passengers < 1000:
+                        speed = 25 * 1.1
+                    else:
+                        speed = 25.0
+                    time_out[i, j] = (distances[i, j] / speed * 60 + 2) * traffic
+                
+                score = 0.0
+                if haversine[i, j] > 10:
+                    score += 20.0
+                elif haversine[i, j] > 5:
+                    score += 10.0
+                if not (acc[i] and acc[j]):
+                    score += 15.0
+                if avg_passengers > 8000:
+                    score += 25.0
+                elif avg_passengers > 5000:
+                    score += 15.0
+                elif avg_passengers < 500:
+                    score += 10.0
+                total_amenities = amen[i] + amen[j]
+                if total_amenities == 0:
+                    score += 20.0
+                elif total_amenities < 3:
+                    score += 10.0
+                difficulty_out[i, j] = min(score, 100.0)
+else:
+    _segment_matrices = _segment_matrices_numpy
+
+
+# Stop count from which great circle distances are computed by the multithreaded
+# Numba kernel; below it, thread startup outweighs the single-threaded pdist
+PARALLEL_HAVERSINE_THRESHOLD = 200
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _haversine_matrix_parallel(axes: np.ndarray, out: np.ndarray) -> None:
+        """Great circle distances in km between all pairs of unit vectors, one row per thread
+        
+        axes is (3, n): one contiguous row per coordinate, so the inner loop reads
+        unit-stride streams and vectorizes.
+        """
+        x, y, z = axes[0], axes[1], axes[2]
+        n = x.shape[0]
+        for i in prange(n):
+            xi, yi, zi = x[i], y[i], z[i]
+            for j in range(n):
+                dx = xi - x[j]
+                dy = yi - y[j]
+                dz = zi - z[j]
+                half_chord = min(np.sqrt(dx * dx + dy * dy + dz * dz) / 2, 1.0)
+                out[i, j] = 2 * 6371 * np.arcsin(half_chord)
+
+
+# Largest stop set ordered exactly; Held-Karp needs 2^(k-1) x (k-1) table entries
+EXACT_ORDER_MAX_STOPS = 15
+
+
+def _held_karp_path(parent: np.ndarray, last: int) -> np.ndarray:
+    """Walk the Held-Karp parent table back from the last stop of the full set"""
+    m = parent.shape[1]
+    order = np.zeros(m + 1, dtype=np.int64)
+    mask = (1 << m) - 1
+    for pos in range(m, 0, -1):
+        order[pos] = last + 1
+        prev = parent[mask, last]
+        mask ^= 1 << last
+        last = prev
+    return order
+
+
+def _tsp_held_karp_numpy(cost_matrix: np.ndarray) -> np.ndarray:
+    """Cheapest open path from stop 0 through all stops of a small cost matrix"""
+    k = cost_matrix.shape[0]
+    m = k - 1
+    if m <= 1:
+        return np.arange(k, dtype=np.int64)
+    
+    # dp[mask, j]: cheapest path from stop 0 through the stops in mask, ending at
+    # stop j + 1; stop j + 1 is bit j, and entries with j outside mask stay inf
+    inner = cost_matrix[1:, 1:]
+    dp = np.full((1 << m, m), np.inf)
+    parent = np.full((1 << m, m), -1, dtype=np.int64)
+    dp[1 << np.arange(m), np.arange(m)] = cost_matrix[0, 1:]
+    
+    for mask in range(1, 1 << m):
+        ends = np.flatnonzero((mask >> np.arange(m)) & 1)
+        if ends.shape[0] < 2:
+            continue
+        # One row per end stop j: dp[mask without j, i] + cost(i -> j) for every i
+        candidates = dp[mask ^ (1 << ends)] + inner[:, ends].T
+        best = np.argmin(candidates, axis=1)
+        dp[mask, ends] = candidates[np.arange(ends.shape[0]), best]
+        parent[mask, ends] = best
+    
+    return _held_karp_path(parent, int(np.argmin(dp[-1])))
+
+
+if njit is not None:
+    _held_karp_path = njit(cache=True)(_held_karp_path)
+    
+    @njit(cache=True)
+    def _tsp_held_karp(cost_matrix: np.ndarray) -> np.ndarray:
+        """Cheapest open path from stop 0 through all stops, by Held-Karp dynamic programming"""
+        k = cost_matrix.shape[0]
+        m = k - 1
+        if m <= 1:
+            return np.arange(k)
+        
+        # dp[mask, j]: cheapest path from stop 0 through the stops in mask, ending
+        # at stop j + 1 (bit j). Masks grow numerically, so subsets come first
+        n_masks = 1 << m
+        dp = np.full((n_masks, m), np.inf)
+        parent = np.full((n_masks, m), -1, dtype=np.int64)
+        for j in range(m):
+            dp[1 << j, j] = cost_matrix[0, j + 1]
+        
+        for mask in range(1, n_masks):
+            for j in range(m):
+                prev = mask ^ (1 << j)
+                if (mask >> j) & 1 == 0 or prev == 0:
+                    continue
+                best = np.inf
+                best_i = -1
+                for i in range(m):
+                    if (prev >> i) & 1:
+                        total = dp[prev, i] + cost_matrix[i + 1, j + 1]
+                        if total < best:
+                            best = total
+                            best_i = i
+                dp[mask, j] = best
+                parent[mask, j] = best_i
+        
+        return _held_karp_path(parent, np.argmin(dp[n_masks - 1]))
+else:
+    _tsp_held_karp = _tsp_held_karp_numpy
+
+
+def _two_opt(route: np.ndarray, cost_matrix: np.ndarray, tolerance: float = 1e-9) -> np.ndarray:
+    """
+    Improve an open path with a fixed first stop by best-improvement 2-opt
+    
+    Reversing route[i+1:j+1] replaces edges (r[i], r[i+1]) and (r[j], r[j+1]) with
+    (r[i], r[j]) and (r[i+1], r[j+1]); the gains of all such moves are evaluated
+    at once on the (symmetric) cost matrix, and the best one is applied until
+    none improves the path.
+    """
+    route = np.array(route, dtype=np.intp)
+    k = route.shape[0]
+    if k < 4:
+        return route
+    
+    # Move (i, j) is valid for j >= i + 2; the last stop has no outgoing edge
+    valid = np.triu(np.ones((k - 1, k), dtype=bool), k=2)
+    while True:
+        a, b = route[:-1], route[1:]
+        edge = cost_matrix[a, b]
+        next_edge = np.append(edge, 0.0)
+        next_stop = np.append(route[1:], route[-1])
+        closing = cost_matrix[b[:, None], next_stop[None, :]]
+        closing[:, -1] = 0.0
+        
+        gain = edge[:, None] + next_edge[None, :] - cost_matrix[a[:, None], route[None, :]] - closing
+        gain[~valid] = 0.0
+        
+        i, j = np.unravel_index(np.argmax(gain), gain.shape)
+        if gain[i, j] <= tolerance:
+            return route
+        route[i + 1:j + 1] = route[i + 1:j + 1][::-1].copy()
+
+
 class PathAlgorithm(Enum):
     """Available path calculation algorithms"""
     HAVERSINE = "haversine"  # Great circle distance
@@ -23,6 +267,12 @@ class PathAlgorithm(Enum):
     WEIGHTED = "weighted"    # Weighted distance considering traffic patterns
 
 
+class ShortestPathMethod(Enum):
+    """Available shortest path implementations"""
+    SCIPY_DIJKSTRA = "scipy_dijkstra"  # Compiled Dijkstra from scipy.sparse.csgraph
+    LEGACY_PY = "legacy_py"            # Pure-Python O(n^2) Dijkstra, kept for comparison
+
+
 @dataclass
 class PathSegment:
     """Represents a segment between two stops"""
@@ -34,15 +284,87 @@ class PathSegment:
     difficulty_score: float  # Based on terrain, traffic, etc.
 
 
+@dataclass
+class _StopsSoA:
+    """Stop attributes as contiguous per-field arrays, for the pairwise kernels"""
+    ids: List[str]
+    lat: np.ndarray   # Degrees, float64
+    lon: np.ndarray   # Degrees, float64
+    pax: np.ndarray   # Daily passenger count, float64
+    acc: np.ndarray   # Accessibility mask, bool
+    amen: np.ndarray  # Number of amenities, int64
+    
+    @classmethod
+    def from_stops(cls, stops: List[BusStop]) -> '_StopsSoA':
+        """Gather each field in a single pass over the stops"""
+        n = len(stops)
+        return cls(
+            ids=[stop.id for stop in stops],
+            lat=np.fromiter((stop.coordinates.latitude for stop in stops), dtype=np.float64, count=n),
+            lon=np.fromiter((stop.coordinates.longitude for stop in stops), dtype=np.float64, count=n),
+            pax=np.fromiter((stop.daily_passenger_count for stop in stops), dtype=np.float64, count=n),
+            acc=np.fromiter((stop.is_accessible for stop in stops), dtype=bool, count=n),
+            amen=np.fromiter((len(stop.amenities) for stop in stops), dtype=np.int64, count=n)
+        )
+
+
 @dataclass
 class PathMatrix:
     """Matrix containing distances and travel times between all stop pairs"""
     stop_ids: List[str]
-    distance_matrix: np.ndarray  # Distance in km
-    time_matrix: np.ndarray      # Time in minutes
-    segments: List[PathSegment]
+    distance_matrix: np.ndarray  # Distance in km (calculator dtype, float32 by default, C-contiguous)
+    time_matrix: np.ndarray      # Time in minutes (same dtype)
+    segments: List[PathSegment]  # Empty unless requested; see iter_segments
     algorithm_used: PathAlgorithm
     calculation_timestamp: str
+    traffic_factor_matrix: Optional[np.ndarray] = None  # Same dtype as distance_matrix
+    difficulty_matrix: Optional[np.ndarray] = None      # Same dtype as distance_matrix
+    
+    @property
+    def segment_count(self) -> int:
+        """Number of segments, one per ordered pair of distinct stops"""
+        n_stops = len(self.stop_ids)
+        return n_stops * (n_stops - 1)
+    
+    @cached_property
+    def stop_index(self) -> Dict[str, int]:
+        """Row/column of each stop ID in the matrices, built on first use"""
+        return {stop_id: i for i, stop_id in enumerate(self.stop_ids)}
+
+
+def iter_segments(matrix: PathMatrix) -> Iterator[PathSegment]:
+    """
+    Generate the segment between every ordered pair of distinct stops
+    
+    Segments are read off the matrices, so their values carry the matrices'
+    storage precision.
+    
+    Args:
+        matrix: Path matrix computed by PathMatrixCalculator
+        
+    Yields:
+        PathSegment for each (origin, destination) pair, in row-major order
+    """
+    if matrix.segments:
+        yield from matrix.segments
+        return
+    
+    stop_ids = matrix.stop_ids
+    for i, origin_id in enumerate(stop_ids):
+        distance_row = matrix.distance_matrix[i].tolist()
+        time_row = matrix.time_matrix[i].tolist()
+        traffic_row = matrix.traffic_factor_matrix[i].tolist()
+        difficulty_row = matrix.difficulty_matrix[i].tolist()
+        for j, destination_id in enumerate(stop_ids):
+            if i != j:
+                yield PathSegment(
+                    origin_stop_id=origin_id,
+                    destination_stop_id=destination_id,
+                    distance_km=distance_row[j],
+                    estimated_time_minutes=int(time_row[j]),
+                    traffic_factor=round(traffic_row[j], 2),  # Factors are whole percentages
+                    difficulty_score=difficulty_row[j]
+                )
 
 
 class PathMatrixCalculator:
@@ -50,9 +372,30 @@ class PathMatrixCalculator:
     Calculates path matrices for route optimization using various algorithms
     """
     
-    def __init__(self):
-        """Initialize the path matrix calculator"""
+    def __init__(self, symmetric: bool = True, dtype: np.dtype = np.float32,
+                 device: str = 'cpu'):
+        """
+        Initialize the path matrix calculator
+        
+        Args:
+            symmetric: Evaluate only the upper triangle of pairwise distances and
+                mirror it, since every supported distance satisfies d(i,j) == d(j,i)
+            dtype: Storage dtype of the returned matrices. Distances are computed in
+                float64 and rounded once, so float32 storage is within 1 ULP
+                (about 1 mm at 10 km) of the float64 result
+            device: 'cpu', or 'cuda' to compute great circle distances on the GPU
+                with CuPy (falls back to 'cpu' when CuPy is not available)
+        """
         self.logger = logging.getLogger(__name__)
+        self.symmetric = symmetric
+        self.dtype = np.dtype(dtype)
+        
+        if device not in ('cpu', 'cuda'):
+            raise ValueError(f"Unsupported device: {device}")
+        if device == 'cuda' and cp is None:
+            self.logger.warning("CuPy is not installed, falling back to CPU path matrix calculation")
+            device = 'cpu'
+        self.device = device
         
         # Traffic patterns (simplified - could be enhanced with real traffic data)
         self.traffic_patterns = {
@@ -63,13 +406,16 @@ class PathMatrixCalculator:
         }
     
     def calculate_path_matrix(self, stops: List[BusStop], 
-                            algorithm: PathAlgorithm = PathAlgorithm.HAVERSINE) -> PathMatrix:
+                            algorithm: PathAlgorithm = PathAlgorithm.HAVERSINE,
+                            include_segments: bool = False) -> PathMatrix:
         """
         Calculate path matrix between all pairs of stops
         
         Args:
             stops: List of bus stops
             algorithm: Algorithm to use for path calculation
+            include_segments: Materialize PathMatrix.segments; otherwise it is left
+                empty and segments can be generated on demand with iter_segments
             
         Returns:
             PathMatrix with distances and travel times
@@ -77,53 +423,153 @@ class PathMatrixCalculator:
         try:
             self.logger.info(f"Calculating path matrix for {len(stops)} stops using {algorithm.value}")
             
-            n_stops = len(stops)
-            stop_ids = [stop.id for stop in stops]
+            soa = _StopsSoA.from_stops(stops)
+            stop_ids = soa.ids
             
-            # Initialize matrices
-            distance_matrix = np.zeros((n_stops, n_stops))
-            time_matrix = np.zeros((n_stops, n_stops))
-            segments = []
+            # Distances for all pairs are computed in one vectorized pass (float64),
+            # then stored in the calculator's dtype. Great circle distances are needed
+            # for difficulty scores whatever the algorithm, so they are computed once
+            haversine = self._haversine_matrix(soa.lat, soa.lon)
+            distances = self._calculate_distance_matrix(soa, algorithm, haversine)
+            distance_matrix = distances.astype(self.dtype)
             
-            # Calculate distances and times for all pairs
-            for i in range(n_stops):
-                for j in range(n_stops):
-                    if i != j:
-                        distance = self._calculate_distance(stops[i], stops[j], algorithm)
-                        time = self._estimate_travel_time(stops[i], stops[j], distance)
-                        traffic_factor = self._get_traffic_factor(stops[i], stops[j])
-                        difficulty = self._calculate_difficulty_score(stops[i], stops[j])
-                        
-                        distance_matrix[i, j] = distance
-                        time_matrix[i, j] = time * traffic_factor
-                        
-                        # Create segment
-                        segment = PathSegment(
-                            origin_stop_id=stops[i].id,
-                            destination_stop_id=stops[j].id,
-                            distance_km=distance,
-                            estimated_time_minutes=int(time * traffic_factor),
-                            traffic_factor=traffic_factor,
-                            difficulty_score=difficulty
-                        )
-                        segments.append(segment)
+            # Travel times, traffic factors and difficulty scores for all pairs, in one pass
+            n_stops = len(stop_ids)
+            time_matrix = np.empty((n_stops, n_stops), dtype=self.dtype)
+            traffic_factor_matrix = np.empty_like(time_matrix)
+            difficulty_matrix = np.empty_like(time_matrix)
+            _segment_matrices(distances, haversine, soa.pax, soa.acc, soa.amen,
+                              time_matrix, traffic_factor_matrix, difficulty_matrix)
             
             matrix = PathMatrix(
                 stop_ids=stop_ids,
                 distance_matrix=distance_matrix,
                 time_matrix=time_matrix,
-                segments=segments,
+                segments=[],
                 algorithm_used=algorithm,
-                calculation_timestamp=str(np.datetime64('now'))
+                calculation_timestamp=datetime.now(timezone.utc).isoformat(),
+                traffic_factor_matrix=traffic_factor_matrix,
+                difficulty_matrix=difficulty_matrix
             )
             
-            self.logger.info(f"Path matrix calculation completed. {len(segments)} segments calculated")
+            # Segments are n(n-1) Python objects; most callers only need the matrices
+            if include_segments:
+                matrix.segments = list(iter_segments(matrix))
+            
+            self.logger.info(f"Path matrix calculation completed. {matrix.segment_count} segments calculated")
             return matrix
             
         except Exception as e:
             self.logger.error(f"Path matrix calculation failed: {e}")
             raise
     
+    def _calculate_distance_matrix(self, soa: _StopsSoA, algorithm: PathAlgorithm,
+                                   haversine: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculate the full distance matrix between stops using array operations
+        
+        haversine, when given, is the precomputed great circle distance matrix.
+        """
+        lat, lon = soa.lat, soa.lon
+        n_stops = len(soa.ids)
+        if haversine is None and algorithm not in (PathAlgorithm.MANHATTAN, PathAlgorithm.EUCLIDEAN):
+            haversine = self._haversine_matrix(lat, lon)
+        
+        if algorithm in (PathAlgorithm.MANHATTAN, PathAlgorithm.EUCLIDEAN):
+            i, j = self._pair_indices(n_stops)
+            lat_diff, lon_diff = self._km_offsets(lat, lon, i, j)
+            if algorithm == PathAlgorithm.MANHATTAN:
+                values = np.abs(lat_diff) + np.abs(lon_diff)
+            else:
+                values = np.hypot(lat_diff, lon_diff)
+            return self._fill_pairs(n_stops, i, j, values)
+        elif algorithm == PathAlgorithm.WEIGHTED:
+            i, j = self._pair_indices(n_stops)
+            weights = self._weight_factors(soa, i, j)
+            weight_matrix = self._fill_pairs(n_stops, i, j, weights)
+            return haversine * weight_matrix
+        else:
+            # Haversine (also the default)
+            return haversine
+    
+    def _pair_indices(self, n_stops: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Index pairs to evaluate: the upper triangle when symmetric, otherwise all pairs"""
+        if self.symmetric:
+            return np.triu_indices(n_stops, k=1)
+        i, j = np.indices((n_stops, n_stops))
+        return i.ravel(), j.ravel()
+    
+    def _fill_pairs(self, n_stops: int, i: np.ndarray, j: np.ndarray,
+                    values: np.ndarray) -> np.ndarray:
+        """Scatter per-pair values into a square matrix, mirroring when symmetric"""
+        matrix = np.zeros((n_stops, n_stops))
+        matrix[i, j] = values
+        if self.symmetric:
+            matrix[j, i] = values
+        return matrix
+    
+    def _pdist_fill(self, points: np.ndarray, metric: str = 'euclidean') -> np.ndarray:
+        """Square distance matrix built from the n(n-1)/2 condensed pair distances"""
+        return squareform(pdist(points, metric=metric), checks=False)
+    
+    def _haversine_matrix(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Great circle distances between all pairs of points
+        
+        Uses the chord length between points on the unit sphere, which lets
+        pdist/cdist do the pairwise work: d = 2r * arcsin(chord / 2).
+        """
+        lat_r, lon_r = np.radians(lat), np.radians(lon)
+        cos_lat = np.cos(lat_r)
+        unit_vectors = np.column_stack((cos_lat * np.cos(lon_r), cos_lat * np.sin(lon_r), np.sin(lat_r)))
+        if self.device == 'cuda':
+            chord = self._gpu_chord_matrix(unit_vectors)
+        elif njit is not None and len(lat) >= PARALLEL_HAVERSINE_THRESHOLD:
+            distances = np.empty((len(lat), len(lat)))
+            _haversine_matrix_parallel(np.ascontiguousarray(unit_vectors.T), distances)
+            return distances
+        elif self.symmetric:
+            chord = self._pdist_fill(unit_vectors)
+        else:
+            chord = cdist(unit_vectors, unit_vectors, metric='euclidean')
+        
+        # Earth's radius in kilometers
+        r = 6371
+        
+        return 2 * r * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+    
+    def _gpu_chord_matrix(self, unit_vectors: np.ndarray, tile_rows: int = 8192) -> np.ndarray:
+        """Pairwise chord lengths between unit vectors on the GPU
+        
+        For unit vectors |a - b|^2 = 2 - 2 a.b, so each row tile is a single GEMM.
+        The GEMM is kept in float64: in float32 the cancellation in 2 - 2 a.b
+        wipes out chords shorter than a few hundred meters.
+        """
+        vectors = cp.asarray(unit_vectors, dtype=cp.float64)
+        n_points = vectors.shape[0]
+        chord = np.empty((n_points, n_points))
+        
+        # Tile along rows so the device buffer stays bounded for large networks
+        for start in range(0, n_points, tile_rows):
+            block = vectors[start:start + tile_rows] @ vectors.T
+            chord[start:start + tile_rows] = cp.asnumpy(cp.sqrt(cp.maximum(2.0 - 2.0 * block, 0.0)))
+        
+        np.fill_diagonal(chord, 0.0)
+        return chord
+    
+    def _km_offsets(self, lat: np.ndarray, lon: np.ndarray,
+                    i: np.ndarray, j: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Latitude/longitude offsets in km for index pairs (1 degree latitude ≈ 111 km)"""
+        lat_diff = (lat[j] - lat[i]) * 111
+        
+        # Longitude distance depends on the average latitude of each pair. With
+        # h = lat/2, cos(h_i + h_j) = cos h_i cos h_j - sin h_i sin h_j, so the trig
+        # is evaluated once per stop rather than once per pair
+        half_lat = np.radians(lat) / 2
+        cos_half, sin_half = np.cos(half_lat), np.sin(half_lat)
+        cos_avg_lat = cos_half[i] * cos_half[j] - sin_half[i] * sin_half[j]
+        lon_diff = (lon[j] - lon[i]) * 111 * cos_avg_lat
+        
+        return lat_diff, lon_diff
+    
     def _calculate_distance(self, stop1: BusStop, stop2: BusStop, 
                           algorithm: PathAlgorithm) -> float:
         """Calculate distance between two stops using specified algorithm"""
@@ -142,15 +588,15 @@ class PathMatrixCalculator:
     
     def _haversine_distance(self, coord1: Coordinates, coord2: Coordinates) -> float:
         """Calculate great circle distance using Haversine formula"""
-        # Convert to radians
-        lat1, lon1 = np.radians(coord1.latitude), np.radians(coord1.longitude)
-        lat2, lon2 = np.radians(coord2.latitude), np.radians(coord2.longitude)
+        # Convert to radians (math rather than NumPy: these are single floats)
+        lat1, lon1 = math.radians(coord1.latitude), math.radians(coord1.longitude)
+        lat2, lon2 = math.radians(coord2.latitude), math.radians(coord2.longitude)
         
         # Haversine formula
         dlat = lat2 - lat1
         dlon = lon2 - lon1
-        a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-        c = 2 * np.arcsin(np.sqrt(a))
+        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+        c = 2 * math.asin(math.sqrt(a))
         
         # Earth's radius in kilometers
         r = 6371
@@ -164,7 +610,7 @@ class PathMatrixCalculator:
         
         # Longitude distance depends on latitude
         avg_lat = (coord1.latitude + coord2.latitude) / 2
-        lon_diff = abs(coord2.longitude - coord1.longitude) * 111 * np.cos(np.radians(avg_lat))
+        lon_diff = abs(coord2.longitude - coord1.longitude) * 111 * math.cos(math.radians(avg_lat))
         
         return lat_diff + lon_diff
     
@@ -175,16 +621,19 @@ class PathMatrixCalculator:
         
         # Longitude distance depends on latitude
         avg_lat = (coord1.latitude + coord2.latitude) / 2
-        lon_diff = (coord2.longitude - coord1.longitude) * 111 * np.cos(np.radians(avg_lat))
+        lon_diff = (coord2.longitude - coord1.longitude) * 111 * math.cos(math.radians(avg_lat))
         
-        return np.sqrt(lat_diff**2 + lon_diff**2)
+        return math.sqrt(lat_diff**2 + lon_diff**2)
     
     def _weighted_distance(self, stop1: BusStop, stop2: BusStop) -> float:
         """Calculate weighted distance considering various factors"""
         # Base distance using Haversine
         base_distance = self._haversine_distance(stop1.coordinates, stop2.coordinates)
         
-        # Apply weights based on stop characteristics
+        return base_distance * self._weight_factor(stop1, stop2)
+    
+    def _weight_factor(self, stop1: BusStop, stop2: BusStop) -> float:
+        """Distance multiplier based on stop characteristics"""
         weight_factor = 1.0
         
         # Accessibility factor - prefer accessible routes
@@ -205,7 +654,18 @@ class PathMatrixCalculator:
         if total_amenities > 4:
             weight_factor *= 0.95  # 5% reduction for well-equipped stops
         
-        return base_distance * weight_factor
+        return weight_factor
+    
+    def _weight_factors(self, soa: _StopsSoA, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Distance multipliers for index pairs, as _weight_factor without branches"""
+        accessibility = np.where(soa.acc[i] & soa.acc[j], 0.95, 1.1)
+        
+        avg_passengers = (soa.pax[i] + soa.pax[j]) / 2
+        volume = np.select([avg_passengers > 5000, avg_passengers < 1000], [0.9, 1.15], default=1.0)
+        
+        amenities = np.where(soa.amen[i] + soa.amen[j] > 4, 0.95, 1.0)
+        
+        return accessibility * volume * amenities
     
     def _estimate_travel_time(self, stop1: BusStop, stop2: BusStop, distance_km: float) -> float:
         """Estimate travel time between stops"""
@@ -283,57 +743,43 @@ class PathMatrixCalculator:
         return min(100.0, score)  # Cap at 100
     
     def find_shortest_path(self, matrix: PathMatrix, origin_id: str, 
-                          destination_id: str) -> Optional[List[str]]:
-        """Find shortest path between two stops using Dijkstra's algorithm"""
+                          destination_id: str,
+                          method: ShortestPathMethod = ShortestPathMethod.SCIPY_DIJKSTRA) -> Optional[List[str]]:
+        """
+        Find shortest path between two stops using Dijkstra's algorithm
+        
+        Args:
+            matrix: Path matrix whose non-zero distances are the graph edges
+            origin_id: ID of the starting stop
+            destination_id: ID of the target stop
+            method: Shortest path implementation to use
+            
+        Returns:
+            List of stop IDs from origin to destination, or None if unreachable
+        """
         try:
-            if origin_id not in matrix.stop_ids or destination_id not in matrix.stop_ids:
+            origin_idx = matrix.stop_index.get(origin_id)
+            destination_idx = matrix.stop_index.get(destination_id)
+            if origin_idx is None or destination_idx is None:
                 return None
             
-            origin_idx = matrix.stop_ids.index(origin_id)
-            destination_idx = matrix.stop_ids.index(destination_id)
+            if method == ShortestPathMethod.LEGACY_PY:
+                return self._legacy_shortest_path(matrix, origin_id, destination_id)
             
-            # Use distance matrix for shortest path calculation
-            distances = matrix.distance_matrix.copy()
-            n_stops = len(matrix.stop_ids)
-            
-            # Dijkstra's algorithm
-            visited = [False] * n_stops
-            dist = [float('inf')] * n_stops
-            parent = [-1] * n_stops
-            
-            dist[origin_idx] = 0
-            
-            for _ in range(n_stops):
-                # Find minimum distance vertex
-                min_dist = float('inf')
-                min_idx = -1
-                
-                for v in range(n_stops):
-                    if not visited[v] and dist[v] < min_dist:
-                        min_dist = dist[v]
-                        min_idx = v
-                
-                if min_idx == -1:
-                    break
-                
-                visited[min_idx] = True
-                
-                # Update distances to neighbors
-                for v in range(n_stops):
-                    if (not visited[v] and distances[min_idx, v] > 0 and
-                        dist[min_idx] + distances[min_idx, v] < dist[v]):
-                        dist[v] = dist[min_idx] + distances[min_idx, v]
-                        parent[v] = min_idx
+            # Zero entries (the diagonal and coincident stops) are not edges, as in the legacy search
+            dist, predecessors = dijkstra(
+                csr_matrix(matrix.distance_matrix), directed=True,
+                indices=origin_idx, return_predecessors=True
+            )
             
-            # Reconstruct path
-            if dist[destination_idx] == float('inf'):
+            if np.isinf(dist[destination_idx]):
                 return None  # No path found
             
             path = []
             current = destination_idx
-            while current != -1:
+            while current >= 0:
                 path.append(matrix.stop_ids[current])
-                current = parent[current]
+                current = predecessors[current]
             
             path.reverse()
             return path
@@ -342,15 +788,71 @@ class PathMatrixCalculator:
             self.logger.error(f"Shortest path calculation failed: {e}")
             return None
     
+    def all_pairs_shortest_distances(self, matrix: PathMatrix) -> np.ndarray:
+        """Shortest path distance between every pair of stops in a single csgraph call"""
+        return dijkstra(csr_matrix(matrix.distance_matrix), directed=True)
+    
+    def _legacy_shortest_path(self, matrix: PathMatrix, origin_id: str,
+                              destination_id: str) -> Optional[List[str]]:
+        """Pure-Python Dijkstra over the dense distance matrix"""
+        origin_idx = matrix.stop_index[origin_id]
+        destination_idx = matrix.stop_index[destination_id]
+        
+        # Use distance matrix for shortest path calculation
+        distances = matrix.distance_matrix  # Only read, so no copy is needed
+        n_stops = len(matrix.stop_ids)
+        
+        # Dijkstra's algorithm
+        visited = [False] * n_stops
+        dist = [float('inf')] * n_stops
+        parent = [-1] * n_stops
+        
+        dist[origin_idx] = 0
+        
+        for _ in range(n_stops):
+            # Find minimum distance vertex
+            min_dist = float('inf')
+            min_idx = -1
+            
+            for v in range(n_stops):
+                if not visited[v] and dist[v] < min_dist:
+                    min_dist = dist[v]
+                    min_idx = v
+            
+            if min_idx == -1:
+                break
+            
+            visited[min_idx] = True
+            
+            # Update distances to neighbors
+            for v in range(n_stops):
+                if (not visited[v] and distances[min_idx, v] > 0 and
+                    dist[min_idx] + distances[min_idx, v] < dist[v]):
+                    dist[v] = dist[min_idx] + distances[min_idx, v]
+                    parent[v] = min_idx
+        
+        # Reconstruct path
+        if dist[destination_idx] == float('inf'):
+            return None  # No path found
+        
+        path = []
+        current = destination_idx
+        while current != -1:
+            path.append(matrix.stop_ids[current])
+            current = parent[current]
+        
+        path.reverse()
+        return path
+    
     def find_optimal_route_order(self, matrix: PathMatrix, stop_ids: List[str]) -> List[str]:
         """Find optimal order to visit a set of stops (simplified TSP)"""
         try:
             if len(stop_ids) <= 2:
                 return stop_ids
             
-            # For small sets, use brute force approach
-            if len(stop_ids) <= 8:
-                return self._brute_force_tsp(matrix, stop_ids)
+            # For small sets, solve exactly
+            if len(stop_ids) <= EXACT_ORDER_MAX_STOPS:
+                return self._exact_tsp(matrix, stop_ids)
             else:
                 # For larger sets, use nearest neighbor heuristic
                 return self._nearest_neighbor_tsp(matrix, stop_ids)
@@ -359,36 +861,22 @@ class PathMatrixCalculator:
             self.logger.error(f"Route optimization failed: {e}")
             return stop_ids  # Return original order as fallback
     
-    def _brute_force_tsp(self, matrix: PathMatrix, stop_ids: List[str]) -> List[str]:
-        """Solve TSP using brute force for small sets"""
-        from itertools import permutations
-        
+    def _exact_tsp(self, matrix: PathMatrix, stop_ids: List[str]) -> List[str]:
+        """Solve TSP exactly for small sets"""
         if not stop_ids:
             return []
         
         # Get indices for the stops
-        indices = [matrix.stop_ids.index(stop_id) for stop_id in stop_ids if stop_id in matrix.stop_ids]
+        stop_index = matrix.stop_index
+        indices = [stop_index[stop_id] for stop_id in stop_ids if stop_id in stop_index]
         
         if len(indices) != len(stop_ids):
             return stop_ids  # Some stops not found in matrix
         
-        best_distance = float('inf')
-        best_order = indices
-        
-        # Try all permutations starting from the first stop
-        first_stop = indices[0]
-        remaining_stops = indices[1:]
-        
-        for perm in permutations(remaining_stops):
-            order = [first_stop] + list(perm)
-            total_distance = 0
-            
-            for i in range(len(order) - 1):
-                total_distance += matrix.distance_matrix[order[i], order[i + 1]]
-            
-            if total_distance < best_distance:
-                best_distance = total_distance
-                best_order = order
+        # Best order starting from the first stop, on the submatrix of these stops
+        indices = np.asarray(indices, dtype=np.int64)
+        cost_matrix = np.ascontiguousarray(matrix.distance_matrix[np.ix_(indices, indices)], dtype=np.float64)
+        best_order = indices[_tsp_held_karp(cost_matrix)].tolist()
         
         # Convert back to stop IDs
         return [matrix.stop_ids[idx] for idx in best_order]
@@ -399,7 +887,8 @@ class PathMatrixCalculator:
             return []
         
         # Get indices for the stops
-        indices = [matrix.stop_ids.index(stop_id) for stop_id in stop_ids if stop_id in matrix.stop_ids]
+        stop_index = matrix.stop_index
+        indices = [stop_index[stop_id] for stop_id in stop_ids if stop_id in stop_index]
         
         if len(indices) != len(stop_ids):
             return stop_ids  # Some stops not found in matrix
@@ -416,6 +905,9 @@ class PathMatrixCalculator:
             unvisited.remove(nearest)
             current = nearest
         
+        # Remove the crossings nearest neighbor leaves behind
+        route = _two_opt(route, matrix.distance_matrix.astype(np.float64, copy=False)).tolist()
+        
         # Convert back to stop IDs
         return [matrix.stop_ids[idx] for idx in route]
     
@@ -424,25 +916,27 @@ class PathMatrixCalculator:
         try:
             n_stops = len(matrix.stop_ids)
             
-            # Calculate average distances
+            # Calculate average distances; the matrices may be float32, so statistics are
+            # reduced in float64 and returned as Python floats to stay JSON-serializable
             distances = matrix.distance_matrix[matrix.distance_matrix > 0]  # Exclude zeros (same stop)
-            avg_distance = np.mean(distances)
-            max_distance = np.max(distances)
-            min_distance = np.min(distances)
+            avg_distance = float(np.mean(distances, dtype=np.float64))
+            max_distance = float(np.max(distances))
+            min_distance = float(np.min(distances))
             
             # Calculate average times
             times = matrix.time_matrix[matrix.time_matrix > 0]
-            avg_time = np.mean(times)
-            max_time = np.max(times)
-            min_time = np.min(times)
-            
-            # Find most connected stops (shortest average distance to all others)
-            connectivity_scores = []
-            for i in range(n_stops):
-                avg_dist_from_stop = np.mean(matrix.distance_matrix[i, matrix.distance_matrix[i] > 0])
-                connectivity_scores.append((matrix.stop_ids[i], avg_dist_from_stop))
+            avg_time = float(np.mean(times, dtype=np.float64))
+            max_time = float(np.max(times))
+            min_time = float(np.min(times))
             
-            connectivity_scores.sort(key=lambda x: x[1])  # Sort by average distance (ascending)
+            # Find most connected stops (shortest average distance to all others),
+            # averaging each row over its non-zero entries in one reduction
+            linked = matrix.distance_matrix > 0
+            with np.errstate(invalid='ignore', divide='ignore'):
+                row_means = (np.sum(matrix.distance_matrix, axis=1, where=linked, dtype=np.float64)
+                             / np.count_nonzero(linked, axis=1))
+            order = np.argsort(row_means, kind='stable')  # Sort by average distance (ascending)
+            connectivity_scores = [(matrix.stop_ids[i], float(row_means[i])) for i in order.tolist()]
             
             # Identify potential bottlenecks (stops that are far from others)
             bottlenecks = connectivity_scores[-3:]  # Top 3 least connected
@@ -450,7 +944,7 @@ class PathMatrixCalculator:
             
             analysis = {
                 'total_stops': n_stops,
-                'total_segments': len(matrix.segments),
+                'total_segments': matrix.segment_count,
                 'distance_stats': {
                     'average_km': round(avg_distance, 2),
                     'maximum_km': round(max_distance, 2),
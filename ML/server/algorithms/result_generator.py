@@ -14,6 +14,8 @@ from models.optimization import OptimizationResult, OptimizationMetrics
 from models.population import PopulationDensityData
 from models.base import Coordinates
 
+from .geometry import segment_distances
+
 logger = logging.getLogger(__name__)
 
 
@@ -240,18 +242,13 @@ class EfficiencyMetricsCalculator:
     
     def _estimate_route_distance(self, route: Route) -> float:
         """Estimate total route distance in kilometers"""
-        if len(route.stops) < 2:
+        n_stops = len(route.stops)
+        if n_stops < 2:
             return 0.0
         
-        total_distance = 0.0
-        for i in range(len(route.stops) - 1):
-            distance = self._calculate_distance(
-                route.stops[i].coordinates,
-                route.stops[i + 1].coordinates
-            )
-            total_distance += distance
-        
-        return total_distance
+        lat = np.fromiter((stop.coordinates.latitude for stop in route.stops), dtype=np.float64, count=n_stops)
+        lon = np.fromiter((stop.coordinates.longitude for stop in route.stops), dtype=np.float64, count=n_stops)
+        return float(segment_distances(lat, lon).sum())
     
     def _calculate_distance(self, coord1: Coordinates, coord2: Coordinates) -> float:
         """Calculate distance between coordinates using Haversine formula"""
@@ -299,19 +296,12 @@ class RouteRankingEngine:
             if not results:
                 return []
             
-            # Calculate ranking scores for each result
-            scored_results = []
-            for result in results:
-                score = self._calculate_ranking_score(result, criteria, weights)
-                scored_results.append((result, score))
+            columns = self._as_columns(results, criteria, weights)
             
-            # Sort by score (descending - higher is better) with stable tie-breaking
-            # First sort by route ID for stability, then by score (stable sort)
-            scored_results.sort(key=lambda x: x[0].original_route_id)  # Secondary sort first
-            scored_results.sort(key=lambda x: x[1], reverse=True)      # Primary sort (stable)
-            
-            # Extract sorted results
-            ranked_results = [result for result, score in scored_results]
+            # Sort by score (descending - higher is better) with stable tie-breaking by
+            # route ID; np.lexsort is stable and treats the last key as primary
+            order = np.lexsort((columns['route_id'], -columns['score']))
+            ranked_results = [results[i] for i in order]
             
             self.logger.info(f"Ranking completed. Best result: {ranked_results[0].optimized_route.name}")
             return ranked_results
@@ -320,6 +310,19 @@ class RouteRankingEngine:
             self.logger.error(f"Failed to rank optimization results: {e}")
             raise
     
+    def _as_columns(self,
+                    results: List[OptimizationResult],
+                    criteria: RankingCriteria,
+                    weights: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+        """Build one contiguous column per sort key for the given results"""
+        return {
+            'score': np.fromiter(
+                (self._calculate_ranking_score(result, criteria, weights) for result in results),
+                dtype=np.float64, count=len(results)
+            ),
+            'route_id': np.array([result.original_route_id for result in results], dtype=str)
+        }
+    
     def _calculate_ranking_score(self, 
                                result: OptimizationResult,
                                criteria: RankingCriteria,
@@ -14,6 +14,8 @@ from models.route import Route, BusStop
 from models.population import PopulationDensityData, DensityPoint
 from models.base import Coordinates
 
+from .geometry import segment_distances
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +58,9 @@ class RouteAnalyzer:
         """Initialize the route analyzer with TensorFlow models"""
         self.logger = logging.getLogger(__name__)
         self._initialize_models()
+        
+        # Compile the edge kernel up front so the first analysis is not slowed down
+        segment_distances(np.zeros(2), np.zeros(2))
     
     def _initialize_models(self):
         """Initialize TensorFlow models for route analysis"""
@@ -173,13 +178,7 @@ class RouteAnalyzer:
         
         # Average distance between consecutive stops (approximated)
         if len(route.stops) > 1:
-            total_distance = 0
-            for i in range(len(route.stops) - 1):
-                dist = self._calculate_distance(
-                    route.stops[i].coordinates,
-                    route.stops[i + 1].coordinates
-                )
-                total_distance += dist
+            total_distance = float(self._route_edge_distances(route).sum())
             avg_distance = total_distance / (len(route.stops) - 1)
             features.append(avg_distance)
         else:
@@ -325,13 +324,7 @@ class RouteAnalyzer:
             return route.estimated_travel_time
         
         # Calculate based on distances and typical speeds
-        total_distance = 0
-        for i in range(len(route.stops) - 1):
-            distance = self._calculate_distance(
-                route.stops[i].coordinates,
-                route.stops[i + 1].coordinates
-            )
-            total_distance += distance
+        total_distance = float(self._route_edge_distances(route).sum())
         
         # Assume average speed of 25 km/h in urban areas
         travel_time_hours = total_distance / 25.0
@@ -405,11 +398,9 @@ class RouteAnalyzer:
                 })
         
         # Check for large gaps between stops
+        edge_distances = self._route_edge_distances(route)
         for i in range(len(route.stops) - 1):
-            distance = self._calculate_distance(
-                route.stops[i].coordinates,
-                route.stops[i + 1].coordinates
-            )
+            distance = float(edge_distances[i])
             if distance > 5.0:  # More than 5km between stops
                 bottlenecks.append({
                     'type': 'large_gap',
@@ -469,6 +460,13 @@ class RouteAnalyzer:
         
         return recommendations
     
+    def _route_edge_distances(self, route: Route) -> np.ndarray:
+        """Haversine distance in km for every consecutive pair of stops"""
+        n_stops = len(route.stops)
+        lat = np.fromiter((stop.coordinates.latitude for stop in route.stops), dtype=np.float64, count=n_stops)
+        lon = np.fromiter((stop.coordinates.longitude for stop in route.stops), dtype=np.float64, count=n_stops)
+        return segment_distances(lat, lon)
+    
     def _calculate_distance(self, coord1: Coordinates, coord2: Coordinates) -> float:
         """Calculate distance between two coordinates using Haversine formula"""
         # Convert to radians
@@ -4,12 +4,28 @@ CityCircuit Flask ML Service
 Main application entry point for the machine learning route optimization service.
 """
 
-from flask import Flask, jsonify, request
-from flask_cors import CORS
 import os
+
+# Thread policy of the service process for the native libraries it loads. These
+# must be set before NumPy/SciPy are first imported, so they come before every
+# other import; setdefault keeps any value the deployment exports. BLAS stays
+# single-threaded so it does not oversubscribe the cores already used by the
+# parallel Numba kernels.
+os.environ.setdefault('OMP_NUM_THREADS', str(max(1, (os.cpu_count() or 1) // 2)))
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from flask_cors import CORS
 from dotenv import load_dotenv
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; Flask's stdlib JSON provider is used instead
+    orjson = None
+
 # Import our data models
 from models import (
     Coordinates, BusStop, Route, PopulationDensityData, DensityPoint,
@@ -20,7 +36,7 @@ from models import (
 # Import route analysis algorithms
 from algorithms import (
     RouteAnalyzer, PopulationAnalyzer, PathMatrixCalculator, 
-    OptimizationEngine, PathAlgorithm, OptimizationResultGenerator,
+    OptimizationEngine, get_optimization_engine, PathAlgorithm, OptimizationResultGenerator,
     EfficiencyMetricsCalculator, RouteRankingEngine, RankingCriteria,
     DataExporter, DataValidator, DataImporter, ExportFormat
 )
@@ -28,9 +44,28 @@ from algorithms import (
 # Load environment variables
 load_dotenv()
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes request/response bodies with orjson"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        # Datetimes go through the default provider's hook so responses are unchanged
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 def create_app():
     """Create and configure the Flask application."""
     app = Flask(__name__)
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
     
     # Configuration
     app.config['SECRET_KEY'] = os.getenv('JWT_SECRET', 'dev-secret-key')
@@ -39,8 +74,9 @@ def create_app():
     # Enable CORS
     CORS(app)
     
-    # Initialize optimization engine
-    optimization_engine = OptimizationEngine()
+    # Initialize optimization engine (shared with batch workers); its analyzers
+    # serve the single-analysis endpoints too
+    optimization_engine = get_optimization_engine()
     
     # Initialize result generator and ranking engine
     result_generator = OptimizationResultGenerator()
@@ -214,7 +250,7 @@ def create_app():
                 population_data = deserialize_model(PopulationDensityData, data['population_data'], 'dict')
             
             # Perform route analysis
-            route_analyzer = RouteAnalyzer()
+            route_analyzer = optimization_engine.route_analyzer
             analysis_result = route_analyzer.analyze_route(route, population_data)
             
             # Convert result to dict for JSON response
@@ -307,7 +343,7 @@ def create_app():
             population_data = deserialize_model(PopulationDensityData, data['population_data'], 'dict')
             
             # Perform population analysis
-            population_analyzer = PopulationAnalyzer()
+            population_analyzer = optimization_engine.population_analyzer
             analysis_result = population_analyzer.analyze_population_data(population_data)
             
             # Convert result to dict for JSON response
@@ -365,7 +401,7 @@ def create_app():
                 algorithm = PathAlgorithm.HAVERSINE
             
             # Calculate path matrix
-            path_calculator = PathMatrixCalculator()
+            path_calculator = optimization_engine.path_calculator
             path_matrix = path_calculator.calculate_path_matrix(stops, algorithm)
             
             # Convert matrices to lists for JSON serialization
@@ -740,6 +776,20 @@ def create_app():
                     'supported_formats': [f.value for f in ExportFormat]
                 }), 400
             
+            # Stream the export body instead of building the whole payload
+            if data.get('stream', False):
+                if export_format not in data_exporter.streaming_formats:
+                    return jsonify({
+                        'status': 'error',
+                        'message': f'Streaming not supported for format: {format_name}',
+                        'streaming_formats': [f.value for f in data_exporter.streaming_formats]
+                    }), 400
+                
+                return Response(
+                    data_exporter.export_route_data_iter(routes, export_format),
+                    mimetype=data_exporter.streaming_formats[export_format]
+                )
+            
             # Get export options
             include_metadata = data.get('include_metadata', True)
             
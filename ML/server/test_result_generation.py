@@ -135,6 +135,16 @@ class TestEfficiencyMetricsCalculator:
         assert metrics.passenger_coverage_increase > 0
         assert metrics.get_overall_score() > 0
 
+    def test_route_distance_matches_pairwise_haversine(self):
+        """Test route distances match the sum of per-pair haversine distances"""
+        stops = self.original_route.stops
+        expected = sum(
+            self.calculator._calculate_distance(stops[i].coordinates, stops[i + 1].coordinates)
+            for i in range(len(stops) - 1)
+        )
+
+        assert self.calculator._estimate_route_distance(self.original_route) == pytest.approx(expected)
+
 
 class TestRouteRankingEngine:
     """Test route ranking functionality"""
@@ -166,7 +166,7 @@ def test_path_matrix_calculator():
     
     print(f"✓ Path Matrix Results:")
     print(f"  - Stops: {len(matrix.stop_ids)}")
-    print(f"  - Segments: {len(matrix.segments)}")
+    print(f"  - Segments: {matrix.segment_count}")
     print(f"  - Algorithm: {matrix.algorithm_used.value}")
     print(f"  - Distance Matrix Shape: {matrix.distance_matrix.shape}")
     print(f"  - Time Matrix Shape: {matrix.time_matrix.shape}")
@@ -209,6 +209,31 @@ def test_optimization_engine():
     print()
 
 
+class FixedScoreEngine(OptimizationEngine):
+    """Engine whose optimized routes carry a fixed score, to tell which class built them"""
+    
+    def _calculate_new_optimization_score(self, original_score, route_analysis):
+        return 42.0
+
+
+def test_batch_optimization_parallel():
+    """Test that parallel batch optimization uses the calling engine and keeps input order"""
+    print("Testing Parallel Batch Optimization...")
+    
+    routes = [create_sample_route() for _ in range(4)]
+    population_data = create_sample_population_data()
+    
+    engine = FixedScoreEngine()
+    results = engine.batch_optimize_routes(routes, population_data, max_workers=2)
+    
+    assert [result.original_route_id for result in results] == [route.id for route in routes]
+    assert all(result.optimized_route.optimization_score == 42.0 for result in results)
+    assert all(result.population_data.region == population_data.region for result in results)
+    
+    print(f"✓ Optimized {len(results)} routes across 2 workers in input order")
+    print()
+
+
 def main():
     """Run all tests"""
     print("=" * 60)
@@ -221,6 +246,7 @@ def main():
         test_population_analyzer()
         test_path_matrix_calculator()
         test_optimization_engine()
+        test_batch_optimization_parallel()
         
         print("=" * 60)
         print("✓ All tests completed successfully!")
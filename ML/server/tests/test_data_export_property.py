@@ -10,6 +10,7 @@ import pytest
 from hypothesis import given, strategies as st, settings, assume
 from datetime import datetime, timezone
 from typing import List, Dict, Any
+import io
 import json
 
 from models import (
@@ -103,6 +104,91 @@ class TestDataExportCompliance:
         imported_stop_counts = [len(route.stops) for route in imported_routes]
         assert sorted(original_stop_counts) == sorted(imported_stop_counts), "Stop counts not preserved"
     
+    @given(st.lists(create_test_route(), min_size=1, max_size=5))
+    @settings(max_examples=30, deadline=None)
+    def test_json_bytes_export_import_round_trip(self, routes: List[Route]):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that the pre-encoded JSON export decodes to a valid, importable JSON export
+        """
+        encoded = self.data_exporter.export_route_data_json_bytes(routes, True)
+        assert isinstance(encoded, bytes)
+        
+        export_result = json.loads(encoded)
+        validation_result = self.data_validator.validate_export(export_result, ExportFormat.JSON)
+        assert validation_result['valid'], f"JSON bytes export validation failed: {validation_result.get('errors', [])}"
+        
+        imported_routes = self.data_importer.import_route_data(export_result, ExportFormat.JSON)
+        assert [route.id for route in imported_routes] == [route.id for route in routes]
+        assert [len(route.stops) for route in imported_routes] == [len(route.stops) for route in routes]
+    
+    @given(st.lists(create_test_route(), min_size=1, max_size=5))
+    @settings(max_examples=30, deadline=None)
+    def test_jsonl_export_import_round_trip(self, routes: List[Route]):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that JSON Lines export and import preserves route data integrity
+        """
+        export_result = self.data_exporter.export_route_data(routes, ExportFormat.JSONL, True)
+        
+        validation_result = self.data_validator.validate_export(export_result, ExportFormat.JSONL)
+        assert validation_result['valid'], f"JSONL export validation failed: {validation_result.get('errors', [])}"
+        assert export_result['line_count'] == len(routes), "Expected one line per route"
+        
+        imported_routes = self.data_importer.import_route_data(export_result, ExportFormat.JSONL)
+        
+        # Property: JSONL round-trip preserves routes in order, including IDs
+        assert [route.id for route in imported_routes] == [route.id for route in routes]
+        assert [route.name for route in imported_routes] == [route.name for route in routes]
+        assert [len(route.stops) for route in imported_routes] == [len(route.stops) for route in routes]
+        
+        # Streaming to a file object produces the same document
+        buffer = io.BytesIO()
+        assert self.data_exporter.write_route_data_jsonl(routes, buffer) == len(routes)
+        assert buffer.getvalue().decode('utf-8') == export_result['data']
+    
+    @given(st.lists(create_test_route(), min_size=1, max_size=5))
+    @settings(max_examples=20, deadline=None)
+    def test_parquet_export_import_round_trip(self, routes: List[Route]):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that Parquet export and import preserves route data integrity
+        """
+        pytest.importorskip("pyarrow")
+        
+        export_result = self.data_exporter.export_route_data(routes, ExportFormat.PARQUET, True)
+        
+        validation_result = self.data_validator.validate_export(export_result, ExportFormat.PARQUET)
+        assert validation_result['valid'], f"Parquet export validation failed: {validation_result.get('errors', [])}"
+        
+        imported_routes = self.data_importer.import_route_data(export_result, ExportFormat.PARQUET)
+        
+        # Property: Parquet round-trip preserves routes and stops exactly, in order
+        assert len(imported_routes) == len(routes), "Route count mismatch after Parquet round-trip"
+        for original, imported in zip(routes, imported_routes):
+            assert imported.id == original.id
+            assert imported.name == original.name
+            assert imported.optimization_score == original.optimization_score
+            assert [stop.id for stop in imported.stops] == [stop.id for stop in original.stops]
+            assert [stop.coordinates for stop in imported.stops] == [stop.coordinates for stop in original.stops]
+            assert [stop.amenities for stop in imported.stops] == [stop.amenities for stop in original.stops]
+    
+    @given(st.lists(create_test_route(), min_size=1, max_size=5))
+    @settings(max_examples=30, deadline=None)
+    def test_csv_chunked_stream_matches_export(self, routes: List[Route]):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that streaming CSV chunks concatenate to the same document as the CSV export
+        """
+        export_result = self.data_exporter.export_route_data(routes, ExportFormat.CSV, False)
+        header = [["stop_id", "route_id", "stop_name", "latitude", "longitude", "address", "amenities",
+                   "daily_passenger_count", "is_accessible", "stop_sequence"]]
+        rows = header + list(self.data_exporter._csv_stop_rows(routes))
+        
+        chunks = list(self.data_exporter.yield_csv_chunks(iter(rows), chunk_size=256))
+        assert all(chunks), "Chunks must not be empty"
+        assert "".join(chunks) == export_result['files']['stops.csv']
+    
     @given(st.lists(create_test_route(), min_size=1, max_size=5))
     @settings(max_examples=30, deadline=None)
     def test_csv_export_import_round_trip(self, routes: List[Route]):
@@ -185,6 +271,41 @@ class TestDataExportCompliance:
         imported_coord_counts = [len(route.stops) for route in imported_routes]
         assert sorted(original_coord_counts) == sorted(imported_coord_counts), "Coordinate counts not preserved"
     
+    @given(st.lists(create_test_route(), min_size=1, max_size=5))
+    @settings(max_examples=30, deadline=None)
+    def test_geojson_bytes_match_geojson_export(self, routes: List[Route]):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that the array-backed GeoJSON encoding decodes to the GeoJSON export
+        """
+        export_result = self.data_exporter.export_route_data(routes, ExportFormat.GEOJSON, False)
+        encoded = self.data_exporter.export_route_data_geojson_bytes(routes, False)
+        
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == export_result
+    
+    @given(st.lists(create_test_route(), min_size=0, max_size=5))
+    @settings(max_examples=30, deadline=None)
+    def test_streamed_export_matches_export(self, routes: List[Route]):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that streamed exports concatenate to the same documents as the regular exports
+        """
+        def stream(format_type: ExportFormat) -> bytes:
+            return b"".join(self.data_exporter.export_route_data_iter(iter(routes), format_type, chunk_size=128))
+        
+        assert json.loads(stream(ExportFormat.JSON)) == json.loads(
+            self.data_exporter.export_route_data_json_bytes(routes, False))
+        
+        jsonl_result = self.data_exporter.export_route_data(routes, ExportFormat.JSONL, False)
+        assert stream(ExportFormat.JSONL).decode('utf-8') == jsonl_result['data']
+        
+        csv_result = self.data_exporter.export_route_data(routes, ExportFormat.CSV, False)
+        assert stream(ExportFormat.CSV).decode('utf-8') == csv_result['files']['stops.csv']
+        
+        with pytest.raises(ValueError):
+            self.data_exporter.export_route_data_iter(routes, ExportFormat.XML)
+    
     @given(st.lists(create_test_route(), min_size=1, max_size=5))
     @settings(max_examples=30, deadline=None)
     def test_gtfs_export_validation(self, routes: List[Route]):
@@ -211,6 +332,23 @@ class TestDataExportCompliance:
             assert required_file in files, f"Missing required GTFS file: {required_file}"
             assert len(files[required_file]) > 0, f"Empty GTFS file: {required_file}"
     
+    @given(st.lists(create_test_route(), min_size=1, max_size=5), st.integers(min_value=1, max_value=9))
+    @settings(max_examples=20, deadline=None)
+    def test_gtfs_zip_matches_file_export(self, routes: List[Route], compresslevel: int):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that the zipped GTFS feed contains exactly the files of the GTFS export
+        """
+        import zipfile
+        
+        files = self.data_exporter.export_route_data(routes, ExportFormat.GTFS, False)['files']
+        zip_result = self.data_exporter.export_gtfs_zip(routes, compresslevel=compresslevel)
+        
+        with zipfile.ZipFile(io.BytesIO(zip_result['zip'])) as zf:
+            assert sorted(zf.namelist()) == sorted(files)
+            for name, content in files.items():
+                assert zf.read(name).decode('utf-8') == content
+    
     @given(st.lists(create_test_route(), min_size=1, max_size=5))
     @settings(max_examples=20, deadline=None)
     def test_export_format_consistency(self, routes: List[Route]):
@@ -287,6 +425,64 @@ class TestDataExportCompliance:
             assert 'routes' in export_result['data'], f"Missing routes data for {i} routes"
             assert len(export_result['data']['routes']) == i, f"Route count mismatch for {i} routes"
     
+    @given(st.text())
+    @settings(max_examples=200, deadline=None)
+    def test_xml_sanitization_replaces_only_invalid_characters(self, text: str):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that XML sanitization keeps every valid XML character and replaces the rest with '?'
+        """
+        def is_valid(code: int) -> bool:
+            return (code in (0x09, 0x0A, 0x0D) or 0x20 <= code <= 0xD7FF or
+                    0xE000 <= code <= 0xFFFD or 0x10000 <= code <= 0x10FFFF)
+        
+        expected = ''.join(char if is_valid(ord(char)) else '?' for char in text)
+        assert self.data_exporter._sanitize_xml_text(text) == expected
+    
+    @given(st.lists(st.text(alphabet=st.sampled_from('ab ,"\r\n;\t')), min_size=2, max_size=6))
+    @settings(max_examples=200, deadline=None)
+    def test_fast_csv_rows_match_csv_writer(self, row: List[str]):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that the writer-free CSV formatting quotes fields exactly like csv.writer
+        """
+        from algorithms.data_exporter import _join_csv_rows, _csv_writer
+        
+        output = io.StringIO(newline='')
+        _csv_writer(output).writerow(row)
+        assert _join_csv_rows([row]) == output.getvalue()
+    
+    def test_xml_import_does_not_expand_external_entities(self, tmp_path):
+        """
+        **Feature: city-circuit, Property 5: Export format compliance**
+        Test that XML import never substitutes the contents of files named by external entities
+        """
+        secret = tmp_path / "secret.txt"
+        secret.write_text("TOP-SECRET-CONTENTS")
+        stops = [BusStop(name=f"Stop {i}", coordinates=Coordinates(latitude=19.0 + i / 100, longitude=72.8),
+                         address="Test address", daily_passenger_count=100, is_accessible=True)
+                 for i in range(2)]
+        route = Route(name="Route name", description="Test route", stops=stops, operator_id="operator",
+                      estimated_travel_time=30, optimization_score=50.0)
+        export_result = self.data_exporter.export_route_data([route], ExportFormat.XML, False)
+        
+        xml_data = export_result['data']
+        if isinstance(xml_data, bytes):
+            xml_data = xml_data.decode('utf-8')
+        doctype = f'<!DOCTYPE transportation_data [<!ENTITY x SYSTEM "{secret.as_uri()}">]>'
+        root = xml_data.index('<transportation_data')
+        xml_data = xml_data[:root] + doctype + xml_data[root:]
+        export_result['data'] = xml_data.replace('<name>Route name</name>', '<name>Route &x;</name>', 1)
+        
+        try:
+            imported_routes = self.data_importer.import_route_data(export_result, ExportFormat.XML)
+        except Exception:
+            return  # Rejecting the document is as safe as ignoring the entity
+        
+        for imported in imported_routes:
+            assert "TOP-SECRET-CONTENTS" not in imported.name
+            assert all("TOP-SECRET-CONTENTS" not in stop.name for stop in imported.stops)
+    
     def test_export_format_enumeration_completeness(self):
         """
         **Feature: city-circuit, Property 5: Export format compliance**
@@ -429,6 +625,11 @@ def test_optimization_result_export_compliance():
     
     assert json_validation['valid'], f"Optimization result JSON export validation failed: {json_validation.get('errors', [])}"
     
+    # Test pre-encoded JSON export
+    encoded_export = json.loads(data_exporter.export_optimization_results_json_bytes([optimization_result]))
+    assert data_validator.validate_export(encoded_export, ExportFormat.JSON)['valid']
+    assert encoded_export['data']['optimization_results'][0]['original_route_id'] == "original-route-1"
+    
     # Test CSV export
     csv_export = data_exporter.export_optimization_results([optimization_result], ExportFormat.CSV)
     csv_validation = data_validator.validate_export(csv_export, ExportFormat.CSV)
@@ -0,0 +1,255 @@
+"""
+Property-based tests for path matrix calculation
+**Feature: city-circuit, Property 1: Route analysis completion**
+**Validates: Requirements 1.1**
+"""
+
+import json
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings, HealthCheck
+from typing import List
+
+from models.route import BusStop
+from models.base import Coordinates
+import algorithms.path_matrix as path_matrix
+from algorithms.path_matrix import (PathMatrixCalculator, PathAlgorithm, ShortestPathMethod, iter_segments,
+                                    _segment_matrices, _segment_matrices_numpy, _StopsSoA,
+                                    _tsp_held_karp, _tsp_held_karp_numpy)
+
+
+@st.composite
+def bus_stop_strategy(draw):
+    """Generate bus stops around the Mumbai area"""
+    coords = Coordinates(
+        latitude=draw(st.floats(min_value=18.8, max_value=19.3)),
+        longitude=draw(st.floats(min_value=72.7, max_value=73.1))
+    )
+    return BusStop(
+        name=draw(st.text(min_size=1, max_size=20, alphabet=st.characters(min_codepoint=65, max_codepoint=90))),
+        coordinates=coords,
+        address="Test address",
+        amenities=draw(st.lists(st.sampled_from(['shelter', 'seating', 'lighting', 'security']),
+                                max_size=4, unique=True)),
+        daily_passenger_count=draw(st.integers(min_value=0, max_value=12000)),
+        is_accessible=draw(st.booleans())
+    )
+
+
+stops_strategy = st.lists(bus_stop_strategy(), min_size=2, max_size=8)
+
+
+class TestPathMatrixConsistency:
+    """Vectorized matrices must agree with the per-pair reference formulas"""
+
+    def setup_method(self):
+        self.calculator = PathMatrixCalculator()
+
+    @pytest.mark.parametrize("algorithm", list(PathAlgorithm))
+    @given(stops=stops_strategy)
+    @settings(max_examples=20, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_distance_matrix_matches_pairwise(self, algorithm: PathAlgorithm, stops: List[BusStop]):
+        matrix = self.calculator.calculate_path_matrix(stops, algorithm)
+        n = len(stops)
+
+        expected = np.zeros((n, n))
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    expected[i, j] = self.calculator._calculate_distance(stops[i], stops[j], algorithm)
+
+        assert matrix.distance_matrix.shape == (n, n)
+        assert matrix.distance_matrix.dtype == np.float32
+        assert matrix.time_matrix.dtype == np.float32
+        np.testing.assert_allclose(matrix.distance_matrix, expected, rtol=1e-5, atol=1e-4)
+        assert np.all(np.diag(matrix.distance_matrix) == 0)
+
+    @pytest.mark.parametrize("algorithm", list(PathAlgorithm))
+    @given(stops=stops_strategy)
+    @settings(max_examples=20, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_time_matrix_matches_pairwise(self, algorithm: PathAlgorithm, stops: List[BusStop]):
+        matrix = self.calculator.calculate_path_matrix(stops, algorithm)
+        n = len(stops)
+
+        expected = np.zeros((n, n))
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    distance = self.calculator._calculate_distance(stops[i], stops[j], algorithm)
+                    expected[i, j] = (self.calculator._estimate_travel_time(stops[i], stops[j], distance)
+                                      * self.calculator._get_traffic_factor(stops[i], stops[j]))
+
+        np.testing.assert_allclose(matrix.time_matrix, expected, rtol=1e-5, atol=1e-3)
+
+    @given(stops=stops_strategy)
+    @settings(max_examples=20, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_difficulty_scores_match_pairwise(self, stops: List[BusStop]):
+        matrix = self.calculator.calculate_path_matrix(stops, PathAlgorithm.EUCLIDEAN)
+        by_pair = {(seg.origin_stop_id, seg.destination_stop_id): seg.difficulty_score
+                   for seg in iter_segments(matrix)}
+
+        for stop1 in stops:
+            for stop2 in stops:
+                if stop1.id != stop2.id:
+                    assert by_pair[(stop1.id, stop2.id)] == \
+                        self.calculator._calculate_difficulty_score(stop1, stop2)
+
+    @given(stops=stops_strategy)
+    @settings(max_examples=20, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_segment_matrix_kernels_agree(self, stops: List[BusStop]):
+        soa = _StopsSoA.from_stops(stops)
+        haversine = self.calculator._haversine_matrix(soa.lat, soa.lon)
+        n = len(stops)
+
+        fused, reference = ([np.empty((n, n), dtype=np.float32) for _ in range(3)] for _ in range(2))
+        _segment_matrices(haversine, haversine, soa.pax, soa.acc, soa.amen, *fused)
+        _segment_matrices_numpy(haversine, haversine, soa.pax, soa.acc, soa.amen, *reference)
+
+        for actual, expected in zip(fused, reference):
+            np.testing.assert_array_equal(actual, expected)
+
+    @given(stops=stops_strategy)
+    @settings(max_examples=10, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_lazy_segments_match_materialized(self, stops: List[BusStop]):
+        lazy = self.calculator.calculate_path_matrix(stops, PathAlgorithm.WEIGHTED)
+        eager = self.calculator.calculate_path_matrix(stops, PathAlgorithm.WEIGHTED, include_segments=True)
+
+        assert lazy.segments == []
+        assert len(eager.segments) == eager.segment_count == len(stops) * (len(stops) - 1)
+        assert list(iter_segments(lazy)) == eager.segments
+
+    @pytest.mark.parametrize("algorithm", list(PathAlgorithm))
+    @given(stops=stops_strategy)
+    @settings(max_examples=10, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_symmetric_fill_matches_full_evaluation(self, algorithm: PathAlgorithm, stops: List[BusStop]):
+        symmetric = PathMatrixCalculator(symmetric=True).calculate_path_matrix(stops, algorithm)
+        full = PathMatrixCalculator(symmetric=False).calculate_path_matrix(stops, algorithm)
+
+        np.testing.assert_allclose(symmetric.distance_matrix, full.distance_matrix, rtol=1e-6, atol=1e-6)
+        np.testing.assert_allclose(symmetric.distance_matrix, symmetric.distance_matrix.T)
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    @given(stops=st.lists(bus_stop_strategy(), min_size=2, max_size=8,
+                          unique_by=lambda stop: (round(stop.coordinates.latitude, 4),
+                                                 round(stop.coordinates.longitude, 4))))
+    @settings(max_examples=10, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_connectivity_analysis_is_json_serializable(self, dtype, stops: List[BusStop]):
+        matrix = PathMatrixCalculator(dtype=dtype).calculate_path_matrix(stops, PathAlgorithm.HAVERSINE)
+        analysis = PathMatrixCalculator().analyze_connectivity(matrix)
+
+        assert 'error' not in analysis
+        assert json.loads(json.dumps(analysis)) == analysis
+
+    @given(stops=st.lists(bus_stop_strategy(), min_size=3, max_size=7))
+    @settings(max_examples=10, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_brute_force_order_is_optimal(self, stops: List[BusStop]):
+        from itertools import permutations
+
+        matrix = self.calculator.calculate_path_matrix(stops, PathAlgorithm.HAVERSINE)
+        order = self.calculator.find_optimal_route_order(matrix, matrix.stop_ids)
+
+        def cost(ids):
+            idx = [matrix.stop_ids.index(stop_id) for stop_id in ids]
+            return sum(matrix.distance_matrix[a, b] for a, b in zip(idx, idx[1:]))
+
+        best = min(cost([matrix.stop_ids[0], *perm]) for perm in permutations(matrix.stop_ids[1:]))
+        assert order[0] == matrix.stop_ids[0]
+        assert sorted(order) == sorted(matrix.stop_ids)
+        assert cost(order) == pytest.approx(best)
+
+    @given(stops=st.lists(bus_stop_strategy(), min_size=16, max_size=20))
+    @settings(max_examples=10, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_two_opt_never_lengthens_nearest_neighbor_order(self, stops: List[BusStop]):
+        matrix = self.calculator.calculate_path_matrix(stops, PathAlgorithm.HAVERSINE)
+        distances = matrix.distance_matrix.astype(np.float64)
+
+        def cost(order):
+            return sum(distances[a, b] for a, b in zip(order, order[1:]))
+
+        # Plain nearest neighbor order from the first stop
+        nearest = [0]
+        unvisited = set(range(1, len(stops)))
+        while unvisited:
+            nearest.append(min(unvisited, key=lambda x: distances[nearest[-1], x]))
+            unvisited.remove(nearest[-1])
+
+        order_ids = self.calculator.find_optimal_route_order(matrix, matrix.stop_ids)
+        order = [matrix.stop_index[stop_id] for stop_id in order_ids]
+        assert order[0] == 0
+        assert sorted(order) == list(range(len(stops)))
+        assert cost(order) <= cost(nearest) + 1e-9
+
+    @given(cost_matrix=st.integers(min_value=1, max_value=7).flatmap(
+        lambda k: st.lists(st.floats(min_value=0.0, max_value=50.0), min_size=k * k, max_size=k * k)
+        .map(lambda values: np.array(values).reshape(k, k))))
+    @settings(max_examples=30, deadline=None)
+    def test_held_karp_matches_exhaustive_search(self, cost_matrix: np.ndarray):
+        from itertools import permutations
+
+        def cost(order):
+            return sum(cost_matrix[a, b] for a, b in zip(order, order[1:]))
+
+        k = cost_matrix.shape[0]
+        best = min(cost((0, *perm)) for perm in permutations(range(1, k)))
+        for solver in (_tsp_held_karp, _tsp_held_karp_numpy):
+            order = solver(cost_matrix)
+            assert order[0] == 0
+            assert sorted(order.tolist()) == list(range(k))
+            assert cost(order) == pytest.approx(best)
+
+    @given(stops=stops_strategy)
+    @settings(max_examples=20, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_scipy_shortest_path_matches_legacy(self, stops: List[BusStop]):
+        matrix = self.calculator.calculate_path_matrix(stops, PathAlgorithm.HAVERSINE)
+        origin, destination = matrix.stop_ids[0], matrix.stop_ids[-1]
+
+        def cost(path):
+            idx = [matrix.stop_ids.index(stop_id) for stop_id in path]
+            return sum(matrix.distance_matrix[a, b] for a, b in zip(idx, idx[1:]))
+
+        fast = self.calculator.find_shortest_path(matrix, origin, destination)
+        legacy = self.calculator.find_shortest_path(matrix, origin, destination,
+                                                    method=ShortestPathMethod.LEGACY_PY)
+
+        assert (fast is None) == (legacy is None)
+        if fast is not None:
+            assert fast[0] == origin and fast[-1] == destination
+            assert cost(fast) == pytest.approx(cost(legacy))
+            all_pairs = self.calculator.all_pairs_shortest_distances(matrix)
+            assert all_pairs[0, len(stops) - 1] == pytest.approx(cost(fast))
+
+    @pytest.mark.skipif(path_matrix.njit is None, reason="numba is not installed")
+    @given(seed=st.integers(min_value=0, max_value=2**32 - 1))
+    @settings(max_examples=5, suppress_health_check=[HealthCheck.function_scoped_fixture], deadline=None)
+    def test_parallel_haversine_matches_pdist(self, seed: int, monkeypatch):
+        rng = np.random.default_rng(seed)
+        n = path_matrix.PARALLEL_HAVERSINE_THRESHOLD
+        lat, lon = rng.uniform(18.8, 19.3, n), rng.uniform(72.7, 73.1, n)
+
+        parallel = self.calculator._haversine_matrix(lat, lon)
+        monkeypatch.setattr(path_matrix, 'PARALLEL_HAVERSINE_THRESHOLD', n + 1)
+        reference = self.calculator._haversine_matrix(lat, lon)
+        monkeypatch.undo()
+
+        np.testing.assert_allclose(parallel, reference, rtol=1e-9, atol=1e-9)
+
+    @given(stops=stops_strategy)
+    @settings(max_examples=10, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_cuda_device_matches_cpu(self, stops: List[BusStop]):
+        # Without CuPy the calculator falls back to the CPU path
+        gpu = PathMatrixCalculator(device='cuda').calculate_path_matrix(stops, PathAlgorithm.HAVERSINE)
+        cpu = self.calculator.calculate_path_matrix(stops, PathAlgorithm.HAVERSINE)
+
+        np.testing.assert_allclose(gpu.distance_matrix, cpu.distance_matrix, rtol=1e-5, atol=1e-4)
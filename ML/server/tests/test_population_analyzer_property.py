@@ -0,0 +1,171 @@
+"""
+Property-based tests for population density analysis
+**Feature: city-circuit, Property 2: Population-based optimization**
+**Validates: Requirements 1.2**
+"""
+
+import math
+import pytest
+from hypothesis import given, strategies as st, settings, HealthCheck
+from typing import List, Tuple
+
+from models.population import PopulationDensityData, DensityPoint, DemographicData
+from models.base import Coordinates, GeoBounds
+import algorithms.population_analyzer as population_analyzer
+from algorithms.population_analyzer import PopulationAnalyzer
+
+
+def reference_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Scalar Haversine distance in km, the per-pair formula the analyzer vectorizes"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2)**2
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+def reference_stop_locations(points: List[Tuple[float, float, int]], max_stops: int = 20) -> List[Tuple[float, float]]:
+    """Greedy stop selection evaluated pair by pair"""
+    if len(points) <= max_stops:
+        return [(lat, lon) for lat, lon, pop in points if pop > 0]
+
+    def score(point, candidates):
+        lat, lon, pop = point
+        total = pop
+        for other_lat, other_lon, other_pop in candidates:
+            if (other_lat, other_lon) != (lat, lon):
+                distance = reference_distance(lat, lon, other_lat, other_lon)
+                if distance <= 1.0:
+                    total += other_pop * max(0, 1.0 - distance)
+        return total
+
+    chosen = []
+    remaining = list(points)
+    for _ in range(max_stops):
+        if not remaining:
+            break
+        best = max(remaining, key=lambda p: score(p, remaining))
+        chosen.append((best[0], best[1]))
+        remaining = [p for p in remaining if reference_distance(p[0], p[1], best[0], best[1]) > 0.5]
+    return chosen
+
+
+def reference_priority_score(point: DensityPoint, local_density: float) -> float:
+    """Per-point priority score: population, local density, working age share and income band"""
+    score = min(50.0, point.population / 1000.0) + min(30.0, local_density / 1000.0)
+    score += point.demographic_data.age_groups.get('25-64', 0) * 0.2
+    income = point.demographic_data.economic_indicators.get('income')
+    if income is not None:
+        score += 10.0 if 20000 <= income <= 60000 else 15.0 if income < 20000 else 0.0
+    return min(100.0, score)
+
+
+@st.composite
+def density_point_strategy(draw):
+    """Generate density points a few kilometers apart around Mumbai"""
+    age_groups = draw(st.dictionaries(st.sampled_from(['0-17', '18-24', '25-64', '65+']),
+                                      st.floats(min_value=0, max_value=60), max_size=4))
+    economic_indicators = draw(st.dictionaries(st.sampled_from(['income', 'employment_rate']),
+                                               st.floats(min_value=0, max_value=120000), max_size=2))
+    return DensityPoint(
+        coordinates=Coordinates(
+            latitude=draw(st.floats(min_value=19.0, max_value=19.05)),
+            longitude=draw(st.floats(min_value=72.8, max_value=72.85))
+        ),
+        population=draw(st.integers(min_value=0, max_value=10000)),
+        demographic_data=DemographicData(age_groups=age_groups, economic_indicators=economic_indicators)
+    )
+
+
+@st.composite
+def population_data_strategy(draw, min_points=1, max_points=40):
+    """Generate a population dataset over a small urban region"""
+    return PopulationDensityData(
+        region="Test region",
+        coordinates=GeoBounds(north=19.05, south=19.0, east=72.85, west=72.8),
+        density_points=draw(st.lists(density_point_strategy(), min_size=min_points, max_size=max_points)),
+        data_source="test"
+    )
+
+
+class TestPopulationAnalyzerConsistency:
+    """Vectorized analysis must agree with the per-pair reference formulas"""
+
+    def setup_method(self):
+        self.analyzer = PopulationAnalyzer()
+
+    @given(population_data=population_data_strategy())
+    @settings(max_examples=30, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_local_density_matches_pairwise(self, population_data: PopulationDensityData):
+        points = population_data.density_points
+        areas = self.analyzer._identify_high_density_areas(population_data)
+
+        for area in areas:
+            lat, lon = area['coordinates']['latitude'], area['coordinates']['longitude']
+            nearby = sum(p.population for p in points
+                         if reference_distance(lat, lon, p.coordinates.latitude, p.coordinates.longitude) <= 1.0)
+            assert area['local_density'] == pytest.approx(nearby / math.pi)
+
+    @given(population_data=population_data_strategy())
+    @settings(max_examples=30, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_priority_scores_match_per_point_formula(self, population_data: PopulationDensityData):
+        areas = self.analyzer._identify_high_density_areas(population_data)
+
+        scores = [area['priority_score'] for area in areas]
+        assert scores == sorted(scores, reverse=True)
+        for area in areas:
+            profile = area['demographic_profile']
+            point = DensityPoint(
+                coordinates=Coordinates(**area['coordinates']),
+                population=area['population'],
+                demographic_data=DemographicData(age_groups=profile['age_groups'],
+                                                 economic_indicators=profile['economic_indicators'])
+            )
+            assert area['priority_score'] == pytest.approx(reference_priority_score(point, area['local_density']))
+
+    @pytest.mark.skipif(population_analyzer.njit is None, reason="numba is not installed")
+    @given(population_data=population_data_strategy())
+    @settings(max_examples=15, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_local_density_kernel_matches_matrix(self, population_data: PopulationDensityData, monkeypatch):
+        monkeypatch.setattr(population_analyzer, 'LOCAL_DENSITY_KERNEL_THRESHOLD', 0)
+        fused = self.analyzer._identify_high_density_areas(population_data)
+        monkeypatch.undo()
+        reference = self.analyzer._identify_high_density_areas(population_data)
+
+        assert [area['local_density'] for area in fused] == \
+            pytest.approx([area['local_density'] for area in reference])
+
+    @given(population_data=population_data_strategy(min_points=21))
+    @settings(max_examples=15, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_stop_locations_match_greedy_reference(self, population_data: PopulationDensityData):
+        points = [(p.coordinates.latitude, p.coordinates.longitude, p.population)
+                  for p in population_data.density_points]
+
+        stops = self.analyzer._find_optimal_stop_locations(population_data)
+
+        assert [(c.latitude, c.longitude) for c in stops] == reference_stop_locations(points)
+
+    @given(population_data=population_data_strategy(), stops=st.lists(
+        st.tuples(st.floats(min_value=19.0, max_value=19.05), st.floats(min_value=72.8, max_value=72.85)),
+        min_size=1, max_size=5))
+    @settings(max_examples=30, suppress_health_check=[HealthCheck.too_slow,
+                                                      HealthCheck.function_scoped_fixture], deadline=None)
+    def test_coverage_gaps_match_nearest_stop(self, population_data: PopulationDensityData,
+                                              stops: List[Tuple[float, float]]):
+        optimal_stops = [Coordinates(latitude=lat, longitude=lon) for lat, lon in stops]
+
+        gaps = self.analyzer._identify_coverage_gaps(population_data, optimal_stops)
+
+        expected = []
+        for p in population_data.density_points:
+            nearest = min(reference_distance(p.coordinates.latitude, p.coordinates.longitude, lat, lon)
+                          for lat, lon in stops)
+            if nearest > 1.0 and p.population > 500:
+                expected.append((p.coordinates.latitude, p.coordinates.longitude, p.population, nearest))
+        expected.sort(key=lambda gap: gap[2], reverse=True)
+
+        assert [(g['coordinates']['latitude'], g['coordinates']['longitude'], g['population'])
+                for g in gaps] == [gap[:3] for gap in expected]
+        assert [g['distance_to_nearest_stop'] for g in gaps] == pytest.approx([gap[3] for gap in expected])
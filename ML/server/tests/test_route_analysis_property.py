@@ -402,6 +402,23 @@ class TestRouteAnalysisCompletion:
         assert 0 <= result.get_overall_score() <= 100, "Overall score must be valid"
         assert result.travel_time_estimate > 0, "Travel time must be positive"
 
+    @given(route_strategy())
+    @settings(max_examples=20, suppress_health_check=[HealthCheck.too_slow], deadline=None)
+    def test_edge_distances_match_pairwise_haversine(self, route: Route):
+        """
+        Property: The edge distance kernel must agree with the per-pair haversine distance
+        """
+        analyzer = RouteAnalyzer()
+
+        edges = analyzer._route_edge_distances(route)
+        expected = [
+            analyzer._calculate_distance(route.stops[i].coordinates, route.stops[i + 1].coordinates)
+            for i in range(len(route.stops) - 1)
+        ]
+
+        assert edges.shape == (len(route.stops) - 1,), "One distance per consecutive stop pair"
+        assert edges == pytest.approx(expected, rel=1e-6, abs=1e-6), "Edge distances must match haversine"
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file